@@ -0,0 +1,528 @@
+"""
+Benchmark suite for the Movie Shell media server and JS API.
+
+Generates a synthetic library (movies, series x seasons x episodes, dummy video files of a
+configurable size) in a temporary directory, then measures - without pywebview:
+  * cold and warm loading of the bundled UI files
+  * MovieShellHTTPHandler full-file and Range throughput
+  * latency under several concurrent streams
+  * get_all_media / get_media_details / get_season_episodes / search_media / search_dialogue latency,
+    warm (repeated on one Api, mostly cache hits) and cold (on a fresh Api), the peak memory of a cold call,
+    and the time to build and incrementally update the subtitle index
+  * the memory footprint of a large catalog (100k episodes by default) as parsed JSON dicts and as a Catalog
+
+Results are written as JSON so runs can be compared across commits:
+    python Benchmark.py --output bench_before.json
+    python Benchmark.py --output bench_after.json
+    python Benchmark.py --compare bench_before.json bench_after.json
+"""
+import argparse
+import functools
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+import Main
+
+MB = 1024 * 1024
+RANGE_CHUNK_SIZE = 1 * MB  # Roughly what browsers request per Range while streaming
+API_COLD_SAMPLES = 20  # Calls per API method made on a fresh Api, so its result caches are empty
+
+
+# --- Synthetic library generation ---
+def _write_dummy_file(path, size, block):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            chunk = block[:min(len(block), remaining)]
+            f.write(chunk)
+            remaining -= len(chunk)
+
+
+def _write_dummy_srt(path, cues=20):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(cues):
+            start = i * 5
+            f.write(f"{i + 1}\n00:00:{start % 60:02d},000 --> 00:00:{(start + 4) % 60:02d},000\n"
+                    f"Synthetic subtitle line number {i + 1}.\n\n")
+
+
+def generate_library(root, movies, series, seasons, episodes, video_size, video_files):
+    """
+    Writes movies.json and the referenced files into root and returns the list of
+    relative paths of the video files that were actually created (used by the HTTP benchmarks).
+    Only the first `video_files` videos get real content; the rest are referenced but missing,
+    which is enough for the API benchmarks and keeps the library small on disk.
+    """
+    rng = random.Random(1234)  # Fixed seed so runs are comparable
+    block = bytes(rng.getrandbits(8) for _ in range(MB))
+    words = ["journey", "mystery", "city", "night", "return", "shadow", "river", "empire", "storm", "garden"]
+    catalog = {"movies": {}, "series": {}}
+    created_videos = []
+
+    def make_video(relative_path):
+        if len(created_videos) < video_files:
+            _write_dummy_file(os.path.join(root, relative_path), video_size, block)
+            created_videos.append(relative_path)
+
+    for i in range(movies):
+        video_path = f"movies/movie_{i:05d}.mp4"
+        make_video(video_path)
+        catalog["movies"][f"Movie {i:05d}"] = {
+            "title": f"The {rng.choice(words).title()} {rng.choice(words).title()} {i}",
+            "type": "movie",
+            "poster": f"images/movie_{i:05d}.png",
+            "video_path": video_path,
+            "trailer_path": None,
+            "year": 1950 + i % 75,
+            "description": " ".join(rng.choice(words) for _ in range(40)),
+        }
+
+    for s in range(series):
+        seasons_data = {}
+        for season in range(1, seasons + 1):
+            episodes_data = {}
+            for e in range(1, episodes + 1):
+                video_path = f"series/series_{s:04d}/season {season}/episode {e}/episode_{e}.mp4"
+                make_video(video_path)
+                if e % 2 == 0:  # Half of the episodes have a sibling subtitle file
+                    _write_dummy_srt(os.path.join(root, os.path.splitext(video_path)[0] + '.srt'))
+                episodes_data[f"Episode {e}"] = {
+                    "title": f"{rng.choice(words).title()} {e}",
+                    "video_path": video_path,
+                    "duration": f"{40 + e % 10}m",
+                }
+            seasons_data[str(season)] = {"episodes": episodes_data}
+        catalog["series"][f"Series {s:04d}"] = {
+            "title": f"{rng.choice(words).title()} Chronicles {s}",
+            "type": "series",
+            "poster": f"images/series_{s:04d}.png",
+            "trailer_path": None,
+            "year": 1990 + s % 35,
+            "description": " ".join(rng.choice(words) for _ in range(60)),
+            "seasons": seasons_data,
+        }
+
+    with open(os.path.join(root, 'movies.json'), 'w', encoding='utf-8') as f:
+        json.dump(catalog, f)
+    return created_videos
+
+
+# --- Measurement helpers ---
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _latency_summary(samples_s):
+    samples_ms = [s * 1000 for s in samples_s]
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(statistics.fmean(samples_ms), 3) if samples_ms else None,
+        "p50_ms": round(_percentile(samples_ms, 50), 3) if samples_ms else None,
+        "p95_ms": round(_percentile(samples_ms, 95), 3) if samples_ms else None,
+        "p99_ms": round(_percentile(samples_ms, 99), 3) if samples_ms else None,
+        "max_ms": round(max(samples_ms), 3) if samples_ms else None,
+    }
+
+
+def _http_get(port, relative_path, headers=None):
+    """Performs one GET on a fresh connection (like the webview does per media request). Returns (status, bytes)."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        conn.request("GET", "/" + quote(relative_path), headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        return response.status, len(body)
+    finally:
+        conn.close()
+
+
+# --- HTTP benchmarks ---
+class _BenchmarkHandler(Main.MovieShellHTTPHandler):
+    pass  # Own class so pointing it at the synthetic library does not touch the app's handler
+
+
+def start_server(library_root):
+    _BenchmarkHandler.bundled_base_dir = os.path.dirname(os.path.abspath(Main.__file__))
+    _BenchmarkHandler.user_content_base_dir = library_root
+    asset_cache = Main.BundledAssetCache(_BenchmarkHandler.bundled_base_dir)
+    asset_cache.load()
+    _BenchmarkHandler.asset_cache = asset_cache
+    httpd = Main.create_http_server(("127.0.0.1", 0), _BenchmarkHandler)
+    thread = threading.Thread(target=httpd.serve_forever, name="BenchmarkServer", daemon=True)
+    thread.start()
+    return httpd
+
+
+def bench_ui_load(port, repeat):
+    """Loads the bundled UI files like the webview does: cold (no validators) and warm (If-None-Match)."""
+    ui_paths = ["", "style.css", "script.js"]
+    etags = {}
+    cold, warm, cold_bytes = [], [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in ui_paths:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            try:
+                conn.request("GET", "/" + path, headers={"Accept-Encoding": "gzip, deflate, br"})
+                response = conn.getresponse()
+                cold_bytes += len(response.read())
+                etags[path] = response.getheader("ETag")
+            finally:
+                conn.close()
+        cold.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for path in ui_paths:
+            headers = {"Accept-Encoding": "gzip, deflate, br"}
+            if etags.get(path):
+                headers["If-None-Match"] = etags[path]
+            _http_get(port, path, headers)
+        warm.append(time.perf_counter() - start)
+    return {"cold": _latency_summary(cold), "warm": _latency_summary(warm),
+            "cold_bytes_per_load": cold_bytes // max(1, repeat)}
+
+
+def bench_full_file(port, videos, repeat):
+    latencies, total_bytes = [], 0
+    start = time.perf_counter()
+    for i in range(repeat):
+        request_start = time.perf_counter()
+        status, size = _http_get(port, videos[i % len(videos)])
+        latencies.append(time.perf_counter() - request_start)
+        assert status == 200, f"Unexpected status {status} for full-file request"
+        total_bytes += size
+    elapsed = time.perf_counter() - start
+    return {"requests": repeat, "bytes": total_bytes, "throughput_mb_s": round(total_bytes / MB / elapsed, 2),
+            "latency": _latency_summary(latencies)}
+
+
+def bench_ranges(port, videos, video_size, requests):
+    rng = random.Random(42)
+    latencies, total_bytes = [], 0
+    start = time.perf_counter()
+    for i in range(requests):
+        offset = rng.randrange(0, max(1, video_size - RANGE_CHUNK_SIZE))
+        headers = {"Range": f"bytes={offset}-{offset + RANGE_CHUNK_SIZE - 1}"}
+        request_start = time.perf_counter()
+        status, size = _http_get(port, videos[i % len(videos)], headers)
+        latencies.append(time.perf_counter() - request_start)
+        assert status == 206, f"Unexpected status {status} for range request"
+        total_bytes += size
+    elapsed = time.perf_counter() - start
+    return {"requests": requests, "chunk_bytes": RANGE_CHUNK_SIZE, "requests_per_s": round(requests / elapsed, 2),
+            "throughput_mb_s": round(total_bytes / MB / elapsed, 2), "latency": _latency_summary(latencies)}
+
+
+def bench_concurrent_streams(port, videos, video_size, streams, chunks_per_stream):
+    """Each stream reads its own video sequentially in RANGE_CHUNK_SIZE pieces, like a playing <video>."""
+    latencies, errors, total_bytes = [], [], [0]
+    lock = threading.Lock()
+
+    def stream(index):
+        path = videos[index % len(videos)]
+        offset = 0
+        for _ in range(chunks_per_stream):
+            if offset >= video_size:
+                offset = 0
+            headers = {"Range": f"bytes={offset}-{offset + RANGE_CHUNK_SIZE - 1}"}
+            request_start = time.perf_counter()
+            try:
+                status, size = _http_get(port, path, headers)
+            except OSError as e:
+                with lock:
+                    errors.append(str(e))
+                return
+            with lock:
+                latencies.append(time.perf_counter() - request_start)
+                total_bytes[0] += size
+            offset += RANGE_CHUNK_SIZE
+
+    threads = [threading.Thread(target=stream, args=(i,)) for i in range(streams)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {"streams": streams, "chunks_per_stream": chunks_per_stream, "errors": len(errors),
+            "aggregate_throughput_mb_s": round(total_bytes[0] / MB / elapsed, 2),
+            "latency": _latency_summary(latencies)}
+
+
+# --- API benchmarks ---
+def _measure_api_call(make_api, method_name, args_list, repeat):
+    """
+    Returns latency stats of repeated calls on one Api (warm: mostly answered from its result caches),
+    "cold" stats of calls each made on a fresh Api, and the peak traced memory of a cold call.
+    """
+    cold_latencies = []
+    for i in range(min(repeat, API_COLD_SAMPLES)):
+        method = getattr(make_api(), method_name)
+        args = args_list[i % len(args_list)]
+        start = time.perf_counter()
+        method(*args)
+        cold_latencies.append(time.perf_counter() - start)
+
+    method = getattr(make_api(), method_name)
+    latencies = []
+    for i in range(repeat):
+        args = args_list[i % len(args_list)]
+        start = time.perf_counter()
+        method(*args)
+        latencies.append(time.perf_counter() - start)
+
+    method = getattr(make_api(), method_name)
+    tracemalloc.start()
+    try:
+        method(*args_list[0])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result = _latency_summary(latencies)
+    result["cold"] = _latency_summary(cold_latencies)
+    result["peak_memory_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def bench_api(library_root, repeat):
+    load_start = time.perf_counter()
+    app = Main.MovieShellApp(user_content_base_dir=library_root)
+    app.wait_for_catalog()
+    catalog_load_ms = (time.perf_counter() - load_start) * 1000
+    # The library check, subtitle indexing and placeholder generation start after the catalog; they
+    # would compete with the measured calls
+    app.wait_for_background_tasks()
+
+    def make_api(**kwargs):
+        return Main.Api(app.movie_data, 0, library_root, catalog_ready=app.catalog_ready, **kwargs)
+
+    names = list(app.movie_data)
+    rng = random.Random(7)
+    movie_names = [n for n in names if app.movie_data[n].get('type') == 'movie'] or names
+    series_names = [n for n in names if app.movie_data[n].get('type') == 'series'] or names
+    queries = ["journey", "chronicles 1", "zzz-no-match", "the storm"]
+
+    results = {"catalog_items": len(names), "catalog_load_ms": round(catalog_load_ms, 3)}
+    results["get_all_media"] = _measure_api_call(make_api, "get_all_media", [()], repeat)
+    results["get_media_details_movie"] = _measure_api_call(
+        make_api, "get_media_details", [(rng.choice(movie_names),) for _ in range(repeat)], repeat)
+    results["get_media_details_series"] = _measure_api_call(
+        make_api, "get_media_details", [(rng.choice(series_names),) for _ in range(repeat)], repeat)
+    results["get_media_details_many"] = _measure_api_call(
+        make_api, "get_media_details_many", [(rng.sample(names, min(24, len(names))),) for _ in range(repeat)],
+        repeat)
+    results["get_season_episodes"] = _measure_api_call(
+        make_api, "get_season_episodes", [(rng.choice(series_names), "1") for _ in range(repeat)], repeat)
+    results["search_media"] = _measure_api_call(make_api, "search_media", [(q,) for q in queries], repeat)
+
+    # Dialogue search over the generated .srt files: full indexing, an incremental pass with nothing
+    # changed, then queries against the index
+    # A separate file: the app created above is indexing into the default one in the background
+    index = Main.SubtitleIndex(library_root, os.path.join(library_root, "benchmark_" + Main.SUBTITLE_INDEX_FILENAME))
+    start = time.perf_counter()
+    index.update(app.movie_data)
+    results["subtitle_index_build_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    start = time.perf_counter()
+    index.update(app.movie_data)
+    results["subtitle_index_update_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    dialogue_queries = ["subtitle line", "number 7", "synthetic", "zzz-no-match"]
+    results["search_dialogue"] = _measure_api_call(functools.partial(make_api, subtitle_index=index),
+                                                   "search_dialogue", [(q,) for q in dialogue_queries], repeat)
+    return results
+
+
+def _synthetic_catalog_json(total_episodes, episodes_per_season=50, seasons_per_series=10):
+    """movies.json text with total_episodes episodes (and no files), shaped like generate_library's series."""
+    rng = random.Random(99)
+    words = ["journey", "mystery", "city", "night", "return", "shadow", "river", "empire", "storm", "garden"]
+    catalog = {"movies": {}, "series": {}}
+    per_series = episodes_per_season * seasons_per_series
+    for s in range((total_episodes + per_series - 1) // per_series):
+        seasons_data = {}
+        for season in range(1, seasons_per_series + 1):
+            episodes_data = {}
+            for e in range(1, episodes_per_season + 1):
+                if s * per_series + (season - 1) * episodes_per_season + e > total_episodes:
+                    break
+                episodes_data[f"Episode {e}"] = {
+                    "title": f"{rng.choice(words).title()} {e}",
+                    "episode_number": e,
+                    "video_path": f"series/series_{s:04d}/season {season}/episode {e}/episode_{e}.mp4",
+                    "duration": f"{40 + e % 10}m",
+                }
+            seasons_data[str(season)] = {"episodes": episodes_data}
+        catalog["series"][f"Series {s:04d}"] = {
+            "title": f"{rng.choice(words).title()} Chronicles {s}",
+            "type": "series",
+            "poster": f"images/series_{s:04d}.png",
+            "year": 1990 + s % 35,
+            "description": " ".join(rng.choice(words) for _ in range(60)),
+            "seasons": seasons_data,
+        }
+    return json.dumps(catalog)
+
+
+def bench_catalog_memory(total_episodes):
+    """
+    Memory held by the catalog: as the nested dicts json.load returns (how it was kept before the
+    compact Catalog) and as a Catalog built from them, both measured with tracemalloc.
+    """
+    catalog_text = _synthetic_catalog_json(total_episodes)
+
+    tracemalloc.start()
+    try:
+        raw_data = json.loads(catalog_text)
+        raw_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        catalog = Main.Catalog()
+        catalog.load(raw_data)
+        del raw_data
+        compact_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return {
+        "episodes": total_episodes,
+        "titles": len(catalog),
+        "dicts_kb": round(raw_bytes / 1024, 1),
+        "catalog_kb": round(compact_bytes / 1024, 1),
+        "catalog_bytes_per_episode": round(compact_bytes / max(1, total_episodes), 1),
+        "reduction_percent": round((1 - compact_bytes / raw_bytes) * 100, 1) if raw_bytes else 0,
+    }
+
+
+# --- Reporting ---
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, child, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+    return out
+
+
+def compare_results(before_path, after_path):
+    """Prints every numeric metric present in both result files with its relative change."""
+    with open(before_path, 'r', encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, 'r', encoding='utf-8') as f:
+        after = json.load(f)
+    before_metrics = _flatten("", before.get("results", {}), {})
+    after_metrics = _flatten("", after.get("results", {}), {})
+    print(f"before: {before['meta'].get('git_commit')} ({before['meta'].get('timestamp')})")
+    print(f"after:  {after['meta'].get('git_commit')} ({after['meta'].get('timestamp')})")
+    width = max((len(k) for k in before_metrics), default=10)
+    for key in sorted(before_metrics.keys() & after_metrics.keys()):
+        old, new = before_metrics[key], after_metrics[key]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{key:<{width}}  {old:>14,.3f}  {new:>14,.3f}  {change:>9}")
+
+
+def run_benchmarks(args):
+    library_root = tempfile.mkdtemp(prefix="movieshell_bench_")
+    video_size = int(args.video_size_mb * MB)
+    try:
+        print(f"Generating synthetic library in {library_root} ...")
+        videos = generate_library(library_root, args.movies, args.series, args.seasons, args.episodes,
+                                  video_size, args.video_files)
+        results = {}
+
+        httpd = start_server(library_root)
+        port = httpd.server_address[1]
+        try:
+            print("Benchmarking UI load ...")
+            results["http_ui_load"] = bench_ui_load(port, args.repeat)
+            if videos:
+                print("Benchmarking full-file requests ...")
+                results["http_full_file"] = bench_full_file(port, videos, args.repeat)
+                print("Benchmarking range requests ...")
+                results["http_range"] = bench_ranges(port, videos, video_size, args.repeat * 10)
+                print(f"Benchmarking {args.streams} concurrent streams ...")
+                results["http_concurrent_streams"] = bench_concurrent_streams(
+                    port, videos, video_size, args.streams, args.repeat * 4)
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+        print("Benchmarking API methods ...")
+        results["api"] = bench_api(library_root, args.repeat)
+        print(f"Measuring catalog memory for {args.memory_episodes} episodes ...")
+        results["catalog_memory"] = bench_catalog_memory(args.memory_episodes)
+    finally:
+        shutil.rmtree(library_root, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "parameters": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Movie Shell media server and API.")
+    parser.add_argument("--movies", type=int, default=500, help="Number of synthetic movies")
+    parser.add_argument("--series", type=int, default=20, help="Number of synthetic series")
+    parser.add_argument("--seasons", type=int, default=5, help="Seasons per series")
+    parser.add_argument("--episodes", type=int, default=10, help="Episodes per season")
+    parser.add_argument("--video-size-mb", type=float, default=16, help="Size of each dummy video file")
+    parser.add_argument("--video-files", type=int, default=4,
+                        help="How many referenced videos get real content (the rest stay missing)")
+    parser.add_argument("--streams", type=int, default=4, help="Concurrent streams for the latency benchmark")
+    parser.add_argument("--memory-episodes", type=int, default=100_000,
+                        help="Episodes in the catalog used for the memory footprint benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Base repetition count per benchmark")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="Compare two result files instead of running the benchmarks")
+    parser.add_argument("--log-level", default="WARNING",
+                        help="Log levels while benchmarking, same format as MOVIE_SHELL_LOG_LEVELS")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+    # Per-request logging is part of what is being measured, so it goes through the app's own pipeline
+    Main.configure_logging(levels=args.log_level)
+    try:
+        run_benchmarks(args)
+    finally:
+        Main.shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Finds duplicate videos in a Movie Shell library and MKV files that have already been converted.
+
+Instead of hashing whole files (tens of GB for a film collection), each video is fingerprinted from
+sampled blocks: its size, the first and last SAMPLE_EDGE_BYTES and SAMPLE_STRIDE_COUNT chunks spread
+evenly over the middle. Only files whose size matches another file's are fingerprinted at all, the
+sampling runs on a process pool, and fingerprints are cached by size and mtime, so a second run over
+an unchanged library only stats the files.
+
+Reported:
+  * duplicate groups - the same video under several names (add --verify to confirm them with a full hash)
+  * converted pairs  - a source .mkv next to the finished .mp4 ConvertToMP4.py made from it
+  * incomplete conversions - the .mp4 next to an .mkv has no index (moov atom, which ffmpeg writes last),
+    so the conversion failed or was stopped and the MKV is still the only good copy
+together with the space that deleting the extra copies would reclaim. Nothing is deleted.
+
+    python FindDuplicates.py
+    python FindDuplicates.py --library D:/MovieShell --verify --json duplicates.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Main import find_mp4_atom
+
+VIDEO_EXTENSIONS = ('.mp4', '.m4v', '.webm', '.mkv', '.ogg', '.avi', '.mov')
+MEDIA_DIRS = ('movies', 'series', 'trailers')  # Scanned below the library root
+SAMPLE_EDGE_BYTES = 1024 * 1024  # Read from the start and from the end of every file
+SAMPLE_STRIDE_COUNT = 16  # Chunks read at even intervals between the two edges
+SAMPLE_STRIDE_BYTES = 64 * 1024
+FULL_HASH_CHUNK_BYTES = 4 * 1024 * 1024
+CACHE_FILENAME = "duplicate_fingerprints.json"
+# Part of the cache, so fingerprints taken with other sampling parameters are never compared
+FINGERPRINT_SCHEME = f"blake2b-edge{SAMPLE_EDGE_BYTES}-stride{SAMPLE_STRIDE_COUNT}x{SAMPLE_STRIDE_BYTES}"
+
+
+# --- Fingerprinting (runs in the worker processes) ---
+def fingerprint_file(path):
+    """
+    Returns the sampled fingerprint of a file (hex digest), or None if it cannot be read.
+    Files no larger than the samples together are hashed completely.
+    """
+    try:
+        size = os.path.getsize(path)
+        digest = hashlib.blake2b(str(size).encode('ascii'), digest_size=20)
+        with open(path, 'rb') as f:
+            if size <= 2 * SAMPLE_EDGE_BYTES + SAMPLE_STRIDE_COUNT * SAMPLE_STRIDE_BYTES:
+                digest.update(f.read())
+                return digest.hexdigest()
+            digest.update(f.read(SAMPLE_EDGE_BYTES))
+            middle_start = SAMPLE_EDGE_BYTES
+            middle_length = size - 2 * SAMPLE_EDGE_BYTES - SAMPLE_STRIDE_BYTES
+            for i in range(SAMPLE_STRIDE_COUNT):
+                f.seek(middle_start + middle_length * i // max(1, SAMPLE_STRIDE_COUNT - 1))
+                digest.update(f.read(SAMPLE_STRIDE_BYTES))
+            f.seek(size - SAMPLE_EDGE_BYTES)
+            digest.update(f.read(SAMPLE_EDGE_BYTES))
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def full_hash_file(path):
+    """Hash of the whole file, used by --verify to rule out false positives of the sampled fingerprint."""
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(FULL_HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+# --- Library scanning ---
+def scan_videos(library_root):
+    """Returns {relative path: (size, mtime_ns)} for every video file below the media folders."""
+    videos = {}
+    for media_dir in MEDIA_DIRS:
+        for dir_path, _, file_names in os.walk(os.path.join(library_root, media_dir)):
+            for file_name in file_names:
+                if not file_name.lower().endswith(VIDEO_EXTENSIONS):
+                    continue
+                full_path = os.path.join(dir_path, file_name)
+                try:
+                    st = os.stat(full_path)
+                except OSError:
+                    continue
+                if st.st_size > 0:
+                    videos[os.path.relpath(full_path, library_root).replace(os.sep, '/')] = (st.st_size, st.st_mtime_ns)
+    return videos
+
+
+def referenced_paths(library_root):
+    """The video paths movies.json points at (a copy that movies.json uses is the one to keep)."""
+    try:
+        with open(os.path.join(library_root, 'movies.json'), 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    paths = set()
+    pending = [catalog]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            for key, child in value.items():
+                if key in ('video_path', 'trailer_path') and isinstance(child, str):
+                    paths.add(child.replace('\\', '/'))
+                else:
+                    pending.append(child)
+        elif isinstance(value, list):
+            pending.extend(value)
+    return paths
+
+
+def load_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(saved, dict) or saved.get('scheme') != FINGERPRINT_SCHEME:
+        return {}
+    return saved.get('files') or {}
+
+
+def save_cache(cache_path, files):
+    temp_path = cache_path + '.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'scheme': FINGERPRINT_SCHEME, 'files': files}, f)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"Could not save the fingerprint cache to {cache_path}: {e}", file=sys.stderr)
+
+
+def fingerprint_videos(library_root, videos, cache, workers):
+    """
+    Returns {relative path: fingerprint} for the videos whose size another video shares (only those can
+    be duplicates), reusing cached fingerprints where size and mtime still match. Updates cache in place.
+    """
+    paths_by_size = {}
+    for path, (size, _) in videos.items():
+        paths_by_size.setdefault(size, []).append(path)
+    candidates = [path for paths in paths_by_size.values() if len(paths) > 1 for path in paths]
+
+    fingerprints = {}
+    to_hash = []
+    for path in candidates:
+        size, mtime_ns = videos[path]
+        cached = cache.get(path)
+        if cached is not None and cached[0] == size and cached[1] == mtime_ns:
+            fingerprints[path] = cached[2]
+        else:
+            to_hash.append(path)
+
+    if to_hash:
+        full_paths = [os.path.join(library_root, path) for path in to_hash]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(fingerprint_file, full_paths, chunksize=max(1, len(full_paths) // (workers * 4)))
+            for path, fingerprint in zip(to_hash, results):
+                if fingerprint is not None:
+                    fingerprints[path] = fingerprint
+                    cache[path] = [*videos[path], fingerprint]
+    print(f"Fingerprinted {len(to_hash)} files ({len(candidates) - len(to_hash)} cached, "
+          f"{len(videos) - len(candidates)} with a unique size skipped)")
+    return fingerprints
+
+
+# --- Analysis ---
+def find_duplicate_groups(library_root, videos, fingerprints, referenced, verify, workers):
+    """Groups of identical videos, the copy to keep first (referenced by movies.json, else the shortest path)."""
+    groups = {}
+    for path, fingerprint in fingerprints.items():
+        groups.setdefault(fingerprint, []).append(path)
+    groups = [paths for paths in groups.values() if len(paths) > 1]
+
+    if verify and groups:
+        # Split each group by the full-file hash; sampled fingerprints can in theory collide
+        paths = [path for group in groups for path in group]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            full_hashes = dict(zip(paths, pool.map(full_hash_file, [os.path.join(library_root, p) for p in paths])))
+        verified = {}
+        for group in groups:
+            for path in group:
+                if full_hashes[path] is not None:
+                    verified.setdefault(full_hashes[path], []).append(path)
+        groups = [paths for paths in verified.values() if len(paths) > 1]
+
+    report = []
+    for paths in groups:
+        paths.sort(key=lambda p: (p not in referenced, len(p), p))
+        size = videos[paths[0]][0]
+        report.append({
+            'size': size,
+            'keep': paths[0],
+            'duplicates': paths[1:],
+            'referenced': sorted(p for p in paths if p in referenced),
+            'reclaimable_bytes': size * (len(paths) - 1),
+        })
+    report.sort(key=lambda group: -group['reclaimable_bytes'])
+    return report
+
+
+def is_finished_mp4(path):
+    """
+    True when the MP4 has a complete moov atom. ffmpeg writes it last, so outputs of failed or stopped
+    conversions do not have one.
+    """
+    try:
+        with open(path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if f.read(8)[4:8] != b'ftyp':
+                return False
+            moov = find_mp4_atom(f, file_size)
+    except OSError:
+        return False
+    return moov is not None and moov[0] + moov[1] <= file_size
+
+
+def find_converted_pairs(library_root, videos, referenced):
+    """
+    Source .mkv files next to an .mp4 of the same name - what ConvertToMP4.py leaves behind.
+    Returns (pairs whose MP4 is finished, pairs whose conversion is incomplete).
+    """
+    pairs = []
+    incomplete = []
+    for path, (size, _) in videos.items():
+        stem, extension = os.path.splitext(path)
+        if extension.lower() != '.mkv':
+            continue
+        converted = next((stem + ext for ext in ('.mp4', '.MP4') if stem + ext in videos), None)
+        if converted is None:
+            continue
+        if not is_finished_mp4(os.path.join(library_root, converted)):
+            incomplete.append({'source': path, 'converted': converted})
+            continue
+        pairs.append({
+            'source': path,
+            'converted': converted,
+            'source_referenced': path in referenced,  # movies.json would need to point at the MP4 first
+            'reclaimable_bytes': size,
+        })
+    pairs.sort(key=lambda pair: -pair['reclaimable_bytes'])
+    incomplete.sort(key=lambda pair: pair['source'])
+    return pairs, incomplete
+
+
+# --- Reporting ---
+def _format_size(num_bytes):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if num_bytes < 1024 or unit == 'GB':
+            return f"{num_bytes:,.1f} {unit}" if unit != 'B' else f"{num_bytes} B"
+        num_bytes /= 1024
+
+
+def print_report(report):
+    groups, pairs = report['duplicate_groups'], report['converted_pairs']
+    print(f"\nDuplicate groups: {len(groups)}")
+    for group in groups:
+        print(f"  {_format_size(group['size'])} each, keep {group['keep']}")
+        for path in group['duplicates']:
+            note = "  (referenced by movies.json)" if path in group['referenced'] else ""
+            print(f"    duplicate: {path}{note}")
+    print(f"\nConverted pairs (source MKV next to its MP4): {len(pairs)}")
+    for pair in pairs:
+        note = "  (movies.json still uses the MKV)" if pair['source_referenced'] else ""
+        print(f"  {pair['source']} -> {pair['converted']}  {_format_size(pair['reclaimable_bytes'])}{note}")
+    if report['incomplete_conversions']:
+        print(f"\nConversion incomplete (the MP4 has no index; keep the MKV): {len(report['incomplete_conversions'])}")
+        for pair in report['incomplete_conversions']:
+            print(f"  {pair['source']} -> {pair['converted']}")
+    print(f"\nReclaimable: {_format_size(report['reclaimable_bytes'])}")
+
+
+def run(args):
+    library_root = os.path.abspath(args.library)
+    cache_path = os.path.join(library_root, CACHE_FILENAME)
+    start = time.perf_counter()
+
+    videos = scan_videos(library_root)
+    print(f"Found {len(videos)} videos in {library_root}")
+    cache = {} if args.no_cache else load_cache(cache_path)
+    # Entries of files that are gone (or changed) are replaced; the cache only keeps what exists now
+    cache = {path: entry for path, entry in cache.items() if path in videos}
+    fingerprints = fingerprint_videos(library_root, videos, cache, args.workers)
+    if not args.no_cache:
+        save_cache(cache_path, cache)
+
+    referenced = referenced_paths(library_root)
+    groups = find_duplicate_groups(library_root, videos, fingerprints, referenced, args.verify, args.workers)
+    pairs, incomplete = find_converted_pairs(library_root, videos, referenced)
+    report = {
+        'library': library_root,
+        'videos': len(videos),
+        'duplicate_groups': groups,
+        'converted_pairs': pairs,
+        'incomplete_conversions': incomplete,
+        'reclaimable_bytes': (sum(g['reclaimable_bytes'] for g in groups)
+                              + sum(p['reclaimable_bytes'] for p in pairs)),
+        'verified': args.verify,
+        'elapsed_s': round(time.perf_counter() - start, 3),
+    }
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find duplicate and already-converted videos in a Movie Shell library.")
+    parser.add_argument("--library", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="Library root containing movies.json and the media folders (default: next to this script)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes used for fingerprinting (default: one per CPU)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Confirm duplicate groups by hashing the whole files (reads them completely)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update the fingerprint cache")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON to PATH")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
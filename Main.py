@@ -1,21 +1,157 @@
-import webview
+import time  # Imported first so the startup trace can measure the remaining imports
+_PROCESS_START = time.perf_counter()
+
 import json
 import os
 import http.server
 import socketserver
 import threading
 import mimetypes
+import functools
+import inspect
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from urllib.parse import quote, unquote  # Import unquote for decoding paths
 import logging  # Import logging module
-import re  # Import regex for parsing range headers
+import logging.handlers
+import itertools
+import queue
+import re  # Import regex for parsing season numbers
 import sys  # Import sys to get executable path
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+import gzip
+import hashlib
+import struct
+import math
+import mmap
+import sqlite3
+import stat
+import uuid
+import io
+import base64
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import brotli  # Optional: adds brotli-encoded variants of the bundled web assets
+except ImportError:
+    brotli = None
+# NOTE: webview is imported lazily in MovieShellApp.run() - it is by far the heaviest import
+# and nothing else (the HTTP server, the Api, the benchmarks) needs it.
+
+# Logging is configured by configure_logging() (called from the __main__ block), not at import time.
+# Each subsystem logs to its own logger so its level can be set independently.
+app_log = logging.getLogger('movieshell.app')
+http_log = logging.getLogger('movieshell.http')
+api_log = logging.getLogger('movieshell.api')
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+# Levels, either one level for everything ("INFO") or per subsystem ("INFO,http=WARNING,api=DEBUG")
+LOG_LEVELS_ENV_VAR = "MOVIE_SHELL_LOG_LEVELS"
+DEFAULT_LOG_LEVELS = "DEBUG"
+# Fraction of HTTP requests whose per-request DEBUG lines are logged (warnings and errors are always logged)
+HTTP_LOG_SAMPLE_RATE_ENV_VAR = "MOVIE_SHELL_HTTP_LOG_SAMPLE_RATE"
+DEFAULT_HTTP_LOG_SAMPLE_RATE = 0.05
 
 # Define the port for the HTTP server
 HTTP_SERVER_PORT = 8000
 
+# Set this environment variable (to anything but "0") to record how long each startup phase takes.
+# The report is logged and written to startup_profile.json next to movies.json.
+STARTUP_TRACE_ENV_VAR = "MOVIE_SHELL_STARTUP_TRACE"
+STARTUP_PROFILE_FILENAME = "startup_profile.json"
+
+# Bundled web assets that are loaded into memory (with precompressed variants) when the server starts,
+# keyed by URL path. Any other file in the bundled 'html' folder is cached under '/html/<name>'.
+BUNDLED_ASSET_ROUTES = {
+    '/': 'html/index.html',
+    '/style.css': 'html/style.css',
+    '/script.js': 'html/script.js',
+    '/about_page.json': 'about_page.json',
+}
+# Responses smaller than this (in bytes) are sent uncompressed - compression would not pay off
+COMPRESSION_MIN_SIZE = 1024
+# MIME types worth compressing (everything else served here is already compressed media)
+COMPRESSIBLE_CONTENT_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+# Number of processed get_media_details results, and of get_season_episodes results, kept in memory
+# (least recently used are dropped first)
+DETAILS_CACHE_SIZE = 256
+# Upper limit on the names accepted by one get_media_details_many call
+DETAILS_BATCH_LIMIT = 64
+# Catalog strings up to this length (durations, types, field names...) are interned so repeats share one object
+CATALOG_INTERN_MAX_LENGTH = 32
+
+# Dialogue search: the text of every video's sibling .srt is indexed in the background into this SQLite
+# database next to movies.json, so later starts only re-read subtitles whose mtime or size changed.
+SUBTITLE_INDEX_FILENAME = "subtitle_index.db"
+SUBTITLE_SEARCH_LIMIT = 50  # Most dialogue hits returned per search
+
+# Library check: every local file movies.json references is stat'ed (and its header probed) on a thread
+# pool. Probe results are kept in this file next to movies.json and reused while a file's mtime and size match.
+LIBRARY_CHECK_FILENAME = "library_check.json"
+LIBRARY_CHECK_VERSION = 1
+LIBRARY_CHECK_WORKERS = 8
+LIBRARY_CHECK_LOG_LIMIT = 20  # Problems logged one by one per run; the rest are only in the report
+LIBRARY_CHECK_PROBE = True  # Whether the check at startup probes headers; False only stats (cheaper on a slow NAS)
+PROBE_HEADER_BYTES = 4096  # Enough for every container/image signature checked
+PROBE_MOOV_MAX_BYTES = 4 * 1024 * 1024  # How much of an MP4's moov atom is searched for codec tags
+
+# Poster placeholders: a tiny version of every poster, inlined in get_all_media as a data: URI, which
+# the grid shows blurred until the real poster is loaded. Needs Pillow (optional); cached next to movies.json.
+POSTER_PLACEHOLDERS_FILENAME = "poster_placeholders.json"
+POSTER_PLACEHOLDERS_VERSION = 1
+POSTER_PLACEHOLDER_MAX_SIDE = 12  # Pixels; the browser scales it up and blurs it, so more would be wasted
+POSTER_PLACEHOLDER_COLORS = 16  # A palette this small is invisible once blurred and makes the PNG ~45% smaller
+POSTER_PLACEHOLDER_WORKERS = 4
+
+# Next-episode read-ahead: when an episode is requested, the start and the index (moov atom) of the
+# following episode are pulled into the OS page cache in the background, within this budget.
+READ_AHEAD_HEAD_BYTES = 8 * 1024 * 1024  # Bytes warmed from the start of the next episode
+READ_AHEAD_INDEX_MAX_BYTES = 16 * 1024 * 1024  # Cap for the moov region (or the file tail if no moov is found)
+READ_AHEAD_RATE_BYTES_PER_S = 8 * 1024 * 1024  # Warming never reads faster than this
+READ_AHEAD_CHUNK_BYTES = 1024 * 1024
+
+# Served files are kept open and memory-mapped for reuse: a scrubbing session sends hundreds of
+# Range requests for the same file, and each would otherwise repeat stat/open/seek/read.
+OPEN_FILE_CACHE_SIZE = 8  # Open files (and their mappings) kept, least recently used are closed first
+STAT_CACHE_TTL = 2.0  # Seconds a cached stat result is trusted before the file's mtime/size is checked again
+SEND_CHUNK_BYTES = 256 * 1024  # Bytes handed to the socket per write when serving from a mapping
+
+# Headless (LAN server) mode defaults
+HEADLESS_HOST = "0.0.0.0"  # Listen on all interfaces so other devices on the network can connect
+HEADLESS_MAX_CONNECTIONS_PER_CLIENT = 8  # Browsers open up to 6 per host; more than this is a misbehaving client
+# Seconds a connection may sit idle (or a client may stop reading) before it is closed and its slot freed
+HEADLESS_CONNECTION_TIMEOUT = 60
+HEADLESS_REJECT_TIMEOUT = 5  # Seconds a refused connection gets to send its request line for the 503
+# Api methods reachable as /api/<name> JSON endpoints in headless mode, with the JSON types of their
+# arguments: str, bool, or [str] for a list of strings. How many are required follows the method's signature.
+HTTP_API_METHODS = {
+    'get_all_media': (),
+    'get_media_details': (str,),
+    'get_media_details_many': ([str],),
+    'get_season_episodes': (str, str),
+    'search_media': (str,),
+    'search_dialogue': (str,),
+    'get_library_report': (),
+    'check_library': (bool,),
+    'get_about_info': (),
+}
+# Largest accepted /api request body in bytes
+HTTP_API_MAX_BODY = 64 * 1024
+BANDWIDTH_BURST_SECONDS = 0.25  # How much unused bandwidth share a client may save up, in seconds of its rate
+BANDWIDTH_RATE_WINDOW_SECONDS = 1.0  # Time constant of the per-client throughput average
+BANDWIDTH_SATURATED_FRACTION = 0.9  # A client receiving less than this of its share leaves the rest to others
+# Headless mode always shares bandwidth fairly; without a budget TCP splits the link per connection, so a
+# client with 8 streams would get 8 times the share of a client with one. 0 (--max-bandwidth 0) turns it off.
+HEADLESS_MAX_BANDWIDTH_MBIT = 200
+
+# A Range header asking for more ranges than this is ignored and the whole file is sent instead
+MAX_RANGES_PER_REQUEST = 16
+
+# Upper bounds (in seconds) of the latency histogram buckets exposed on /metrics
+METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
 # Add mimetypes for video files and subtitle files
 mimetypes.add_type("video/mp4", ".mp4")
 mimetypes.add_type("video/x-m4v", ".m4v")
@@ -97,6 +233,1517 @@ DUMMY_MOVIES_JSON_CONTENT = {
 }
 
 
+class _RequestLogSampler:
+    """
+    Decides per request whether its DEBUG lines are logged: every Nth request for a rate of 1/N.
+    Deciding once per request keeps all lines of a sampled request together.
+    """
+
+    def __init__(self, rate):
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        rate = min(max(float(rate), 0.0), 1.0)
+        self.interval = round(1 / rate) if rate > 0 else 0
+        self._counter = itertools.count()
+
+    def should_log(self):
+        if not self.interval:
+            return False
+        return next(self._counter) % self.interval == 0  # next() on itertools.count is atomic
+
+
+http_request_sampler = _RequestLogSampler(DEFAULT_HTTP_LOG_SAMPLE_RATE)
+_log_listener = None
+
+
+class _UnformattedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records as they are. The stock prepare() formats the message and the traceback on the emitting
+    thread so records can be pickled; this queue stays in-process, so formatting is left to the listener.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _parse_log_levels(spec):
+    """Parses "INFO,http=WARNING" into {'movieshell': 'INFO', 'movieshell.http': 'WARNING'}."""
+    levels = {}
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '=' in part:
+            subsystem, level = (p.strip() for p in part.split('=', 1))
+            levels[f'movieshell.{subsystem}'] = level.upper()
+        else:
+            levels['movieshell'] = part.upper()
+    return levels
+
+
+def configure_logging(levels=None, http_sample_rate=None):
+    """
+    Sets up asynchronous logging: records are put on a queue by a QueueHandler (cheap, non-blocking)
+    and formatted and written to stderr by a QueueListener thread, so serving threads never wait on the console.
+    levels and http_sample_rate default to the MOVIE_SHELL_LOG_LEVELS / MOVIE_SHELL_HTTP_LOG_SAMPLE_RATE
+    environment variables.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.addHandler(_UnformattedQueueHandler(log_queue))
+    root.setLevel(logging.WARNING)  # Third-party libraries (pywebview etc.) stay quiet unless they warn
+
+    for logger_name, level in _parse_log_levels(levels or os.environ.get(LOG_LEVELS_ENV_VAR, DEFAULT_LOG_LEVELS)).items():
+        try:
+            logging.getLogger(logger_name).setLevel(level)
+        except ValueError:
+            app_log.warning("Ignoring invalid log level %r for %s", level, logger_name)
+
+    if http_sample_rate is None:
+        http_sample_rate = os.environ.get(HTTP_LOG_SAMPLE_RATE_ENV_VAR, DEFAULT_HTTP_LOG_SAMPLE_RATE)
+    try:
+        http_request_sampler.set_rate(http_sample_rate)
+    except ValueError:
+        app_log.warning("Ignoring invalid HTTP log sample rate %r", http_sample_rate)
+
+    _log_listener.start()
+
+
+def shutdown_logging():
+    """Flushes the log queue and stops the listener thread."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+class StartupProfiler:
+    """
+    Records the duration of each startup phase and the time of notable startup events
+    (e.g. the first poster painted by the UI), measured from process start.
+    Everything is a no-op unless the profiler is enabled, so it can stay wired in permanently.
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._phases = []
+        self._events = {}
+
+    def _elapsed_ms(self, timestamp):
+        return round((timestamp - _PROCESS_START) * 1000, 2)
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager timing one startup phase. Phases may run concurrently on different threads."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._phases.append({
+                    "phase": name,
+                    "thread": threading.current_thread().name,
+                    "start_ms": self._elapsed_ms(start),
+                    "end_ms": self._elapsed_ms(end),
+                    "duration_ms": round((end - start) * 1000, 2),
+                })
+
+    def mark(self, name):
+        """Records the first occurrence of a startup event. Returns True if this call recorded it."""
+        if not self.enabled:
+            return False
+        now = time.perf_counter()
+        with self._lock:
+            if name in self._events:
+                return False
+            self._events[name] = self._elapsed_ms(now)
+            return True
+
+    def report(self):
+        with self._lock:
+            return {
+                "phases": sorted(self._phases, key=lambda p: p["start_ms"]),
+                "events": dict(sorted(self._events.items(), key=lambda item: item[1])),
+            }
+
+    def write_report(self, path):
+        """Logs the startup report and writes it as JSON to the given path."""
+        if not self.enabled:
+            return
+        report = self.report()
+        for phase in report["phases"]:
+            app_log.info("Startup phase '%s' on %s: %s ms (at %s-%s ms)", phase['phase'], phase['thread'],
+                         phase['duration_ms'], phase['start_ms'], phase['end_ms'])
+        for event_name, at_ms in report["events"].items():
+            app_log.info("Startup event '%s' at %s ms", event_name, at_ms)
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            app_log.debug("Startup profile written to %s", path)
+        except OSError as e:
+            app_log.error("Failed to write startup profile to %s: %s", path, e)
+
+
+startup_profiler = StartupProfiler(os.environ.get(STARTUP_TRACE_ENV_VAR, "0") not in ("", "0"))
+
+
+class _Histogram:
+    """A cumulative Prometheus-style histogram over METRICS_LATENCY_BUCKETS."""
+    __slots__ = ('bucket_counts', 'count', 'total')
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(METRICS_LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        for i, upper_bound in enumerate(METRICS_LATENCY_BUCKETS):
+            if value <= upper_bound:
+                self.bucket_counts[i] += 1
+                break
+
+
+class ServerMetrics:
+    """
+    Thread-safe counters, gauges and latency histograms for the HTTP server and the Api,
+    rendered in the Prometheus text exposition format by the /metrics endpoint.
+    Labels are passed as a tuple of (name, value) pairs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, metric_type, help_text):
+        self._help[name] = (metric_type, help_text)
+
+    def inc(self, name, labels=(), amount=1):
+        with self._lock:
+            key = (name, labels)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def gauge_add(self, name, labels=(), delta=1):
+        with self._lock:
+            key = (name, labels)
+            self._gauges[key] = self._gauges.get(key, 0) + delta
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            key = (name, labels)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(value)
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = tuple(labels) + tuple(extra)
+        if not pairs:
+            return ''
+        escaped = []
+        for key, value in pairs:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{key}="{value}"')
+        return '{' + ','.join(escaped) + '}'
+
+    def render_prometheus(self):
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: (list(h.bucket_counts), h.count, h.total) for key, h in self._histograms.items()}
+
+        lines = []
+        described = set()
+
+        def header(name):
+            if name not in described and name in self._help:
+                metric_type, help_text = self._help[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+            described.add(name)
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name)
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+        for (name, labels), value in sorted(gauges.items()):
+            header(name)
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+        for (name, labels), (bucket_counts, count, total) in sorted(histograms.items()):
+            header(name)
+            cumulative = 0
+            for upper_bound, bucket_count in zip(METRICS_LATENCY_BUCKETS, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{self._format_labels(labels, (('le', upper_bound),))} {cumulative}")
+            lines.append(f"{name}_bucket{self._format_labels(labels, (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{self._format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = ServerMetrics()
+metrics.describe("movieshell_http_requests_total", "counter",
+                 "HTTP requests by route, status code and response kind (full, range or error).")
+metrics.describe("movieshell_http_bytes_sent_total", "counter", "Bytes written to clients (headers included).")
+metrics.describe("movieshell_http_active_connections", "gauge", "Client connections currently being handled.")
+metrics.describe("movieshell_http_request_duration_seconds", "histogram", "Time to serve a request completely.")
+metrics.describe("movieshell_http_time_to_first_byte_seconds", "histogram",
+                 "Time from receiving a request to sending the response headers.")
+metrics.describe("movieshell_read_ahead_bytes_total", "counter",
+                 "Bytes of upcoming episodes warmed into the page cache.")
+metrics.describe("movieshell_http_rejected_connections_total", "counter",
+                 "Connections refused because a client exceeded its connection limit.")
+metrics.describe("movieshell_api_calls_total", "counter", "Api method calls by outcome.")
+metrics.describe("movieshell_api_call_duration_seconds", "histogram", "Api method execution time.")
+
+
+def classify_route(decoded_path):
+    """Maps a request path onto a small, fixed set of route labels for the metrics."""
+    if decoded_path == '/' or decoded_path.startswith('/?'):
+        return 'index'
+    if decoded_path in ('/style.css', '/script.js') or decoded_path.startswith('/html/'):
+        return 'asset'
+    if decoded_path == '/metrics':
+        return 'metrics'
+    if decoded_path == '/api' or decoded_path.startswith('/api/'):
+        return 'api'
+    if decoded_path == '/about_page.json':
+        return 'about'
+    for prefix in ('images', 'movies', 'series', 'trailers'):
+        if decoded_path.startswith(f'/{prefix}/'):
+            return prefix
+    return 'other'
+
+
+def timed_api_method(func):
+    """Decorator recording the duration and outcome of an Api method in the metrics."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = 'ok'
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            method_label = (('method', func.__name__),)
+            metrics.observe("movieshell_api_call_duration_seconds", method_label, time.perf_counter() - start)
+            metrics.inc("movieshell_api_calls_total", method_label + (('outcome', outcome),))
+
+    return wrapper
+
+
+class _CountingWriter:
+    """Wraps a handler's wfile and counts the bytes written through it."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.bytes_written = 0
+
+    def write(self, data):
+        written = self._raw.write(data)
+        self.bytes_written += len(data)
+        return written
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+def compress_variants(body):
+    """Returns {'gzip': ..., 'br': ...} for body, leaving out encodings that are unavailable or do not help."""
+    variants = {}
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        variants['gzip'] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            variants['br'] = compressed
+    return variants
+
+
+def choose_content_encoding(accept_encoding, available):
+    """
+    Picks the best encoding from `available` (a collection of 'br', 'gzip') that the client accepts
+    according to its Accept-Encoding header, preferring brotli. Returns 'identity' if none fits.
+    """
+    if not accept_encoding or not available:
+        return 'identity'
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in ('br', 'gzip'):
+        if encoding in available and accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return 'identity'
+
+
+class CachedAsset:
+    """One bundled asset held in memory: the raw bytes plus precompressed variants, each with its own ETag."""
+    __slots__ = ('content_type', 'bodies', 'etags')
+
+    def __init__(self, content_type, body):
+        self.content_type = content_type
+        self.bodies = {'identity': body}
+        self.bodies.update(compress_variants(body))
+        digest = hashlib.sha1(body).hexdigest()[:20]
+        # Every encoding is a different representation, so it needs a different (strong) ETag
+        self.etags = {encoding: f'"{digest}"' if encoding == 'identity' else f'"{digest}-{encoding}"'
+                      for encoding in self.bodies}
+
+
+class BundledAssetCache:
+    """
+    The bundled UI files (index.html, script.js, style.css, about_page.json, html/*), read from disk
+    and compressed once at startup instead of on every window load.
+    """
+
+    def __init__(self, bundled_base_dir):
+        self.bundled_base_dir = bundled_base_dir
+        self._assets = {}
+
+    def load(self):
+        routes = dict(BUNDLED_ASSET_ROUTES)
+        html_dir = os.path.join(self.bundled_base_dir, 'html')
+        if os.path.isdir(html_dir):
+            for name in os.listdir(html_dir):
+                if os.path.isfile(os.path.join(html_dir, name)):
+                    routes.setdefault(f'/html/{name}', f'html/{name}')
+
+        assets = {}
+        for url_path, relative_path in routes.items():
+            full_path = os.path.join(self.bundled_base_dir, relative_path)
+            try:
+                with open(full_path, 'rb') as f:
+                    body = f.read()
+            except OSError as e:
+                app_log.warning("Bundled asset %s could not be cached: %s", full_path, e)
+                continue
+            content_type, _ = mimetypes.guess_type(full_path)
+            content_type = content_type or 'application/octet-stream'
+            if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+                content_type += '; charset=utf-8'
+            assets[url_path] = CachedAsset(content_type, body)
+        self._assets = assets
+        app_log.debug("Cached %d bundled assets in memory (brotli %s)", len(assets),
+                      "enabled" if brotli is not None else "not installed")
+
+    def get(self, url_path):
+        return self._assets.get(url_path)
+
+
+def _season_sort_key(season_key):
+    # Same order as the UI: "1", "season 2", ... by number; keys without a number go last
+    match = re.search(r'\d+', str(season_key))
+    return (0, int(match.group())) if match else (1, str(season_key))
+
+
+def _episode_sort_key(episode):
+    # Numeric like the UI's `epA - epB`, so "10" follows "9" and strings mix with numbers; anything else is 0
+    try:
+        number = float(episode.get('episode_number') or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return number if number == number else 0.0  # NaN would break the ordering
+
+
+_MISSING = object()  # Marks a field a catalog entry does not have (as opposed to one set to null)
+
+
+def _intern_value(value):
+    if isinstance(value, str) and len(value) <= CATALOG_INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+class EpisodeTable:
+    """
+    All episodes of one series, stored column by column: one list per field (plus one for the episode
+    names) instead of one dict per episode. The episodes of a season are a contiguous range of rows;
+    season_starts[i] is the first row of season_keys[i] and the last entry is the total row count.
+    """
+    __slots__ = ('season_keys', 'season_starts', 'names', 'columns')
+
+    def __init__(self, seasons):
+        season_keys = []
+        self.season_starts = array('L')
+        self.names = []
+        self.columns = {}
+        for season_key, season_data in seasons.items():
+            season_keys.append(sys.intern(str(season_key)))
+            self.season_starts.append(len(self.names))
+            episodes = season_data.get('episodes') if isinstance(season_data, dict) else None
+            for episode_name, episode in (episodes or {}).items():
+                row = len(self.names)
+                self.names.append(episode_name)
+                for field, value in (episode or {}).items():
+                    column = self.columns.get(field)
+                    if column is None:
+                        column = self.columns[sys.intern(field)] = [_MISSING] * row
+                    column.append(_intern_value(value))
+                for column in self.columns.values():
+                    if len(column) == row:
+                        column.append(_MISSING)
+        self.season_starts.append(len(self.names))
+        self.season_keys = tuple(season_keys)
+
+    def __len__(self):
+        return len(self.names)
+
+    def season_summary(self):
+        """{season_key: {"episode_count": n}} in catalog order, as sent to the UI with a series' details."""
+        return {season_key: {'episode_count': self.season_starts[i + 1] - self.season_starts[i]}
+                for i, season_key in enumerate(self.season_keys)}
+
+    def season_episodes(self, season_key):
+        """Returns [(episode name, episode dict), ...] for one season (as new dicts), or None if it does not exist."""
+        try:
+            i = self.season_keys.index(str(season_key))
+        except ValueError:
+            return None
+        columns = self.columns.items()
+        return [(self.names[row], {field: column[row] for field, column in columns if column[row] is not _MISSING})
+                for row in range(self.season_starts[i], self.season_starts[i + 1])]
+
+
+class TitleRecord:
+    """One movie or series of the catalog. Fields movies.json has beyond the common ones are kept in extra."""
+    __slots__ = ('type', 'title', 'year', 'poster', 'video_path', 'trailer_path', 'description', 'extra',
+                 'episodes')
+    _FIELDS = ('title', 'year', 'poster', 'video_path', 'trailer_path', 'description')
+
+    def __init__(self, media_type, details):
+        details = dict(details)
+        details.pop('type', None)
+        seasons = details.pop('seasons', None) if media_type == 'series' else None
+        self.type = media_type
+        for field in self._FIELDS:
+            setattr(self, field, _intern_value(details.pop(field, _MISSING)))
+        self.extra = {sys.intern(field): _intern_value(value) for field, value in details.items()} or None
+        self.episodes = EpisodeTable(seasons) if isinstance(seasons, dict) else None
+
+    def get(self, field, default=None):
+        if field == 'type':
+            return self.type
+        value = getattr(self, field) if field in self._FIELDS else (self.extra or {}).get(field, _MISSING)
+        return default if value is _MISSING else value
+
+    def to_dict(self):
+        """The title's fields as in movies.json (with 'type'), without its seasons."""
+        item = {'type': self.type}
+        for field in self._FIELDS:
+            value = getattr(self, field)
+            if value is not _MISSING:
+                item[field] = value
+        if self.extra:
+            item.update(self.extra)
+        return item
+
+
+class Catalog:
+    """
+    The library: TitleRecords by their name in movies.json, movies first. Loaded once (on the catalog
+    loader thread) and read-only afterwards, so readers need no locking.
+    """
+
+    def __init__(self):
+        self._titles = {}
+
+    def load(self, raw_data):
+        """Replaces the catalog with the contents of a parsed movies.json, published in one step."""
+        titles = {}
+        for section, media_type in (('movies', 'movie'), ('series', 'series')):
+            for name_in_json, details in (raw_data.get(section) or {}).items():
+                titles[name_in_json] = TitleRecord(media_type, details)
+        self._titles = titles
+
+    def __len__(self):
+        return len(self._titles)
+
+    def __iter__(self):
+        return iter(self._titles)
+
+    def __contains__(self, name_in_json):
+        return name_in_json in self._titles
+
+    def __getitem__(self, name_in_json):
+        return self._titles[name_in_json]
+
+    def get(self, name_in_json, default=None):
+        return self._titles.get(name_in_json, default)
+
+    def items(self):
+        return self._titles.items()
+
+    def values(self):
+        return self._titles.values()
+
+
+def build_episode_order(catalog):
+    """
+    Returns {video path: video path of the next episode} for every series in the catalog,
+    following the order the UI shows (seasons by number, episodes by episode_number) and
+    continuing into the next season after a season's last episode.
+    """
+    next_episode = {}
+    for record in catalog.values():
+        if record.episodes is None:
+            continue
+        ordered_paths = []
+        for season_key in sorted(record.episodes.season_keys, key=_season_sort_key):
+            episodes = [episode for _, episode in record.episodes.season_episodes(season_key)]
+            for episode in sorted(episodes, key=_episode_sort_key):
+                video_path = episode.get('video_path')
+                if video_path and not video_path.startswith(('http://', 'https://')):
+                    ordered_paths.append(video_path)
+        for current_path, following_path in zip(ordered_paths, ordered_paths[1:]):
+            next_episode[current_path] = following_path
+    return next_episode
+
+
+def find_mp4_atom(f, file_size, atom_type=b'moov', max_atoms=64):
+    """
+    Walks the top-level atoms of an MP4 file (reading only their 8/16-byte headers)
+    and returns (offset, size) of the first atom of the given type, or None.
+    """
+    offset = 0
+    for _ in range(max_atoms):
+        if offset + 8 > file_size:
+            return None
+        f.seek(offset)
+        header = f.read(16)
+        if len(header) < 8:
+            return None
+        size, kind = struct.unpack('>I4s', header[:8])
+        if size == 1 and len(header) == 16:  # 64-bit extended size
+            size = struct.unpack('>Q', header[8:16])[0]
+        elif size == 0:  # Atom extends to the end of the file
+            size = file_size - offset
+        if kind == atom_type:
+            return offset, size
+        if size < 8:
+            return None  # Corrupt or not an MP4 file
+        offset += size
+    return None
+
+
+class EpisodeReadAhead:
+    """
+    Warms the next episode while the current one plays, so auto-advance and the first seek do not
+    stall on a cold disk or NAS. A single low-priority thread warms the first READ_AHEAD_HEAD_BYTES
+    and the moov region of the next episode (posix_fadvise WILLNEED where available, plain reads
+    elsewhere), never faster than READ_AHEAD_RATE_BYTES_PER_S so it does not compete with the active stream.
+    """
+
+    def __init__(self, user_content_base_dir):
+        self.user_content_base_dir = user_content_base_dir
+        self._next_episode = {}  # normalized absolute path -> absolute path of the next episode
+        self._warmed = set()  # Episodes already warmed (or queued) during this session
+        self._pending = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _normalize(self, path):
+        return os.path.normcase(os.path.normpath(os.path.join(self.user_content_base_dir, path)))
+
+    def set_episode_order(self, catalog):
+        next_episode = {self._normalize(current): os.path.join(self.user_content_base_dir, following)
+                        for current, following in build_episode_order(catalog).items()}
+        with self._lock:
+            self._next_episode = next_episode
+        app_log.debug("Read-ahead knows the successors of %d episodes", len(next_episode))
+
+    def on_media_request(self, path):
+        """Called by the HTTP handler for every video request; queues the following episode once."""
+        with self._lock:
+            following = self._next_episode.get(self._normalize(path))
+            if following is None or following in self._warmed:
+                return
+            self._warmed.add(following)  # Added before queueing so concurrent range requests do not queue it again
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="EpisodeReadAhead", daemon=True)
+                self._thread.start()
+        self._pending.put(following)
+
+    def _run(self):
+        while True:
+            path = self._pending.get()
+            try:
+                self._warm(path)
+            except OSError as e:
+                app_log.debug("Read-ahead of %s failed: %s", path, e)
+
+    def _warm(self, path):
+        with open(path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            head_length = min(file_size, READ_AHEAD_HEAD_BYTES)
+            moov = find_mp4_atom(f, file_size)
+            if moov is not None:
+                index_offset, index_length = moov[0], min(moov[1], READ_AHEAD_INDEX_MAX_BYTES)
+            else:
+                # No moov in the header walk: players will look at the end of the file next
+                index_length = min(file_size, READ_AHEAD_INDEX_MAX_BYTES)
+                index_offset = file_size - index_length
+            # The head goes first - it is what auto-advance needs - then whatever of the index it did not cover
+            index_end = min(file_size, index_offset + index_length)
+            index_offset = max(index_offset, head_length)
+
+            warmed_bytes = self._warm_region(f, 0, head_length)
+            if index_end > index_offset:
+                warmed_bytes += self._warm_region(f, index_offset, index_end - index_offset)
+        app_log.debug("Read-ahead warmed %d bytes of %s", warmed_bytes, path)
+
+    def _warm_region(self, f, offset, length):
+        warmed = 0
+        while warmed < length:
+            chunk = min(READ_AHEAD_CHUNK_BYTES, length - warmed)
+            start = time.perf_counter()
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), offset + warmed, chunk, os.POSIX_FADV_WILLNEED)
+            else:
+                f.seek(offset + warmed)
+                f.read(chunk)
+            warmed += chunk
+            metrics.inc("movieshell_read_ahead_bytes_total", (), chunk)
+            # Sleep off whatever is left of this chunk's share of the rate budget
+            remaining = chunk / READ_AHEAD_RATE_BYTES_PER_S - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+        return warmed
+
+
+SRT_TIMESTAMP_RE = re.compile(r'(\d+):(\d{2}):(\d{2})[,.](\d{1,3})\s*-->')
+SUBTITLE_MARKUP_RE = re.compile(r'<[^>]*>|\{[^}]*\}')  # <i>, <font ...>, {\an8} and similar
+WORD_RE = re.compile(r'\w+')
+
+
+def parse_srt(text):
+    """Returns [(start in milliseconds, cue text), ...] for the cues of an SRT file, markup removed."""
+    cues = []
+    for block in re.split(r'\n\s*\n', text.replace('\r\n', '\n').replace('\r', '\n')):
+        lines = block.strip().split('\n')
+        for i, line in enumerate(lines):
+            match = SRT_TIMESTAMP_RE.search(line)
+            if match:
+                hours, minutes, seconds, millis = match.groups()
+                start_ms = ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis.ljust(3, '0'))
+                cue_text = ' '.join(SUBTITLE_MARKUP_RE.sub('', l).strip() for l in lines[i + 1:]).strip()
+                if cue_text:
+                    cues.append((start_ms, cue_text))
+                break
+    return cues
+
+
+class SubtitleIndex:
+    """
+    Full-text index of the subtitles next to the catalog's videos, kept in an SQLite FTS5 table at
+    index_path: every cue (start time and text) is a row, tokenized into SQLite's inverted index, so
+    a search is a lookup rather than a scan and nothing has to be loaded at startup. A file's cues use
+    the rowids file id << CUE_BITS | cue number, so re-indexing one file replaces one rowid range.
+    update() only re-reads .srt files whose mtime or size changed since they were indexed.
+    """
+    CUE_BITS = 24
+    SCHEMA_VERSION = 1
+
+    def __init__(self, user_content_base_dir, index_path):
+        self.user_content_base_dir = user_content_base_dir
+        self.index_path = index_path
+        self._lock = threading.Lock()  # One connection, shared by the indexer and the API threads
+        self._db = None
+        self._sources = {}  # srt path (relative) -> (name_in_json, season_key, episode_name), from the catalog
+
+    def _connect(self):
+        if self._db is None:
+            db = sqlite3.connect(self.index_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")  # A lost update after a crash is simply re-indexed
+            # Another process (or index) may be opening the same file: check and create the schema atomically
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                if db.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                    db.execute("DROP TABLE IF EXISTS files")
+                    db.execute("DROP TABLE IF EXISTS cues")
+                    db.execute("CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+                               "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL)")
+                    db.execute("CREATE VIRTUAL TABLE cues USING fts5(text, start_ms UNINDEXED, "
+                               "tokenize='unicode61 remove_diacritics 2')")
+                    db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+                db.commit()
+            except sqlite3.Error:
+                db.rollback()
+                db.close()
+                raise
+            self._db = db
+        return self._db
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def update(self, catalog):
+        """Brings the index up to date with the .srt files of the catalog's videos."""
+        sources = {}
+        for name_in_json, record in catalog.items():
+            video_paths = [(None, None, record.get('video_path'))]
+            if record.episodes is not None:
+                for season_key in record.episodes.season_keys:
+                    video_paths.extend((season_key, episode_name, episode.get('video_path'))
+                                       for episode_name, episode in record.episodes.season_episodes(season_key))
+            for season_key, episode_name, video_path in video_paths:
+                if video_path and not video_path.startswith(('http://', 'https://')):
+                    sources[os.path.splitext(video_path)[0] + '.srt'] = (name_in_json, season_key, episode_name)
+
+        with self._lock:
+            self._sources = sources  # Searches can use what was indexed in earlier runs right away
+            indexed = {path: (file_id, mtime_ns, size) for file_id, path, mtime_ns, size
+                       in self._connect().execute("SELECT id, path, mtime_ns, size FROM files")}
+
+        reindexed = removed = 0
+        for srt_path in sources:
+            try:
+                st = os.stat(os.path.join(self.user_content_base_dir, srt_path))
+            except OSError:
+                continue  # This video has no subtitles
+            file_id, mtime_ns, size = indexed.pop(srt_path, (None, None, None))
+            if mtime_ns == st.st_mtime_ns and size == st.st_size:
+                continue
+            cues = self._read_cues(srt_path)
+            if cues is not None:
+                self._store(srt_path, file_id, st, cues)
+                reindexed += 1
+        # Whatever is left was not seen this time: its video left the catalog or its subtitles were deleted
+        for file_id, _, _ in indexed.values():
+            self._store(None, file_id, None, ())
+            removed += 1
+        app_log.debug("Subtitle index updated: %d files re-indexed, %d removed", reindexed, removed)
+
+    def _read_cues(self, srt_path):
+        try:
+            with open(os.path.join(self.user_content_base_dir, srt_path), 'r', encoding='utf-8-sig',
+                      errors='replace') as f:
+                return parse_srt(f.read())
+        except OSError as e:
+            app_log.warning("Could not index subtitles %s: %s", srt_path, e)
+            return None
+
+    def _store(self, srt_path, file_id, st, cues):
+        """Replaces the cues of one file (srt_path None: removes the file) in a single transaction."""
+        with self._lock:
+            db = self._connect()
+            with db:
+                if file_id is not None:
+                    db.execute("DELETE FROM cues WHERE rowid BETWEEN ? AND ?",
+                               (file_id << self.CUE_BITS, ((file_id + 1) << self.CUE_BITS) - 1))
+                    db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                if srt_path is None:
+                    return
+                file_id = db.execute("INSERT INTO files (id, path, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                                     (file_id, srt_path, st.st_mtime_ns, st.st_size)).lastrowid
+                first_rowid = file_id << self.CUE_BITS
+                db.executemany("INSERT INTO cues (rowid, text, start_ms) VALUES (?, ?, ?)",
+                               ((first_rowid + cue_number, cue_text, start_ms) for cue_number, (start_ms, cue_text)
+                                in enumerate(cues[:1 << self.CUE_BITS])))
+
+    def search(self, query, limit=SUBTITLE_SEARCH_LIMIT):
+        """
+        Returns up to limit hits for the cues containing every word of query, as
+        {"srt_path", "name_in_json", "season", "episode", "start" (seconds), "text"} dicts.
+        """
+        words = WORD_RE.findall((query or '').lower())
+        if not words:
+            return []
+        # Every word quoted, so user input is never parsed as FTS5 query syntax. Whole words only:
+        # prefix matches of short words expand to thousands of terms and are ~100x slower.
+        match = ' '.join(f'"{word}"' for word in words)
+        with self._lock:
+            db = self._connect()
+            rows = db.execute("SELECT cues.rowid, start_ms, text, files.path FROM cues "
+                              "JOIN files ON files.id = cues.rowid >> ? "
+                              "WHERE cues MATCH ? ORDER BY cues.rowid LIMIT ?",
+                              (self.CUE_BITS, match, limit)).fetchall()
+            sources = self._sources
+        hits = []
+        for _, start_ms, cue_text, srt_path in rows:
+            source = sources.get(srt_path)
+            if source is None:
+                continue  # Indexed in an earlier run, not part of the current catalog (yet to be removed)
+            name_in_json, season_key, episode_name = source
+            hits.append({'srt_path': srt_path, 'name_in_json': name_in_json, 'season': season_key,
+                         'episode': episode_name, 'start': start_ms / 1000, 'text': cue_text})
+        return hits
+
+
+IMAGE_SIGNATURES = (b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'BM', b'\x00\x00\x01\x00')
+HEVC_SAMPLE_ENTRIES = (b'hvc1', b'hev1')  # H.265 video, which Chromium-based webviews do not decode
+
+
+def probe_media_file(f, file_size, kind):
+    """
+    Reads the header of an open file and returns why a browser could not use it as kind ('video' or
+    'image'), or None when it looks fine. Only container signatures (and, for MP4, the index and the
+    video codec tags) are checked - the streams themselves are not decoded.
+    """
+    header = f.read(PROBE_HEADER_BYTES)
+    if kind == 'image':
+        if header.startswith(IMAGE_SIGNATURES) or (header[:4] == b'RIFF' and header[8:12] == b'WEBP'):
+            return None
+        if b'<svg' in header[:1024]:
+            return None
+        return "Not a recognized image format"
+
+    if header[4:8] == b'ftyp':
+        moov = find_mp4_atom(f, file_size)
+        if moov is None:
+            return "MP4 file has no index (moov atom); it is probably truncated"
+        offset, size = moov
+        f.seek(offset)
+        moov_data = f.read(min(size, PROBE_MOOV_MAX_BYTES))
+        if any(tag in moov_data for tag in HEVC_SAMPLE_ENTRIES):
+            return "HEVC (H.265) video, which most browsers cannot play"
+        return None
+    if header[:4] == b'\x1a\x45\xdf\xa3':  # EBML: WebM or Matroska, told apart by the DocType
+        if b'webm' in header[:64]:
+            return None
+        return "Matroska (MKV) container, which many browsers cannot play; convert it to MP4 (ConvertToMP4.py)"
+    if header[:4] == b'OggS':
+        return None
+    return "Not a recognized video container"
+
+
+# Problems _check_file finds from stat/open alone. Only these disable playback: the container and codec
+# verdicts of probe_media_file are heuristics (WebView2 plays MKV and HEVC in many setups), shown as a warning.
+FILE_PROBLEMS = ("Missing", "Not a regular file", "Empty (zero-length) file", "Unreadable")
+
+
+def problem_blocks_playback(problem):
+    return problem.startswith(FILE_PROBLEMS)
+
+
+def is_shutdown_error(error):
+    """
+    True for the RuntimeError thread pools raise when the process exits while a background task is
+    starting work ("cannot schedule new futures after interpreter shutdown" and the like).
+    """
+    return isinstance(error, RuntimeError) and 'shutdown' in str(error)
+
+
+class LibraryCheck:
+    """
+    Verifies the local files movies.json references (posters, videos, trailers, episodes): missing,
+    zero-length and browser-unplayable files are reported. run() stats every file on a thread pool and
+    only re-probes files whose mtime or size changed since the cached result. The per-title summary it
+    publishes lets the Api mark unplayable titles without touching the filesystem.
+    """
+
+    def __init__(self, user_content_base_dir, cache_path):
+        self.user_content_base_dir = user_content_base_dir
+        self.cache_path = cache_path
+        self.generation = 0  # Incremented whenever new results are published
+        self._run_lock = threading.Lock()  # One run at a time
+        self._cache = None  # path -> [mtime_ns, size, problem], loaded by load_cached or the first run
+        self._report = None
+        self._title_problems = {}  # name_in_json -> (description of what may not play, blocks playback)
+        self._episode_problems = {}  # video path -> (problem, blocks playback), for the episode lists
+
+    def load_cached(self, catalog):
+        """
+        Publishes the results cached by the previous run for the files the catalog references, so the first
+        grid already marks unplayable titles; run() replaces them once it has checked the files again.
+        """
+        references = self._references(catalog)
+        with self._run_lock:
+            if self._cache is None:
+                self._cache = self._load_cache()
+            cached = {path: self._cache[path][2] for path in references if path in self._cache}
+            if cached:
+                self._publish(catalog, references, cached, from_cache=True)
+
+    def run(self, catalog, probe=True):
+        """
+        Checks every referenced file and publishes the results. Returns the report. With probe=False files
+        are only stat'ed: headers are not read, and changed files keep no container verdict until a probing run.
+        """
+        references = self._references(catalog)
+        with self._run_lock:
+            if self._cache is None:
+                self._cache = self._load_cache()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=LIBRARY_CHECK_WORKERS, thread_name_prefix="LibraryCheck") as pool:
+                kinds = ['image' if refs[0][3] == 'poster' else 'video' for refs in references.values()]
+                results = dict(zip(references, pool.map(self._check_file, references, kinds,
+                                                        itertools.repeat(probe))))
+            self._cache = {path: result[1] for path, result in results.items() if result[1] is not None}
+            self._save_cache()
+            self._publish(catalog, references, {path: result[0] for path, result in results.items()})
+            app_log.info("Library check: %d files in %.0f ms, %d problems", len(references),
+                         (time.perf_counter() - start) * 1000, len(self._report['problems']))
+            problems = self._report['problems']
+            for entry in problems[:LIBRARY_CHECK_LOG_LIMIT]:
+                app_log.warning("Library check: %s: %s (used by %s)", entry['path'], entry['problem'],
+                                ', '.join(sorted({ref['name_in_json'] for ref in entry['references']})))
+            if len(problems) > LIBRARY_CHECK_LOG_LIMIT:
+                app_log.warning("Library check: %d more problems, see get_library_report",
+                                len(problems) - LIBRARY_CHECK_LOG_LIMIT)
+            return self._report
+
+    @staticmethod
+    def _references(catalog):
+        """Returns {path: [(name_in_json, season_key, episode_name, field), ...]} of the catalog's local files."""
+        references = {}
+        for name_in_json, record in catalog.items():
+            fields = [(None, None, field, record.get(field)) for field in ('poster', 'video_path', 'trailer_path')]
+            if record.episodes is not None:
+                for season_key in record.episodes.season_keys:
+                    fields.extend((season_key, episode_name, 'video_path', episode.get('video_path'))
+                                  for episode_name, episode in record.episodes.season_episodes(season_key))
+            for season_key, episode_name, field, path in fields:
+                if path and isinstance(path, str) and not path.startswith(('http://', 'https://')):
+                    references.setdefault(path, []).append((name_in_json, season_key, episode_name, field))
+        return references
+
+    def _check_file(self, path, kind, probe=True):
+        """
+        Returns (problem or None, cache entry or None). Problems found by stat alone are cached without mtime
+        and size - they are only used by load_cached, as the next run stats the file again anyway.
+        """
+        full_path = os.path.join(self.user_content_base_dir, path)
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            return "Missing", [None, None, "Missing"]
+        if not stat.S_ISREG(st.st_mode):
+            return "Not a regular file", [None, None, "Not a regular file"]
+        if st.st_size == 0:
+            return "Empty (zero-length) file", [None, None, "Empty (zero-length) file"]
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2], cached
+        if not probe:
+            return None, None
+        try:
+            with open(full_path, 'rb') as f:
+                problem = probe_media_file(f, st.st_size, kind)
+        except OSError as e:
+            problem = f"Unreadable: {e.strerror or e}"
+            return problem, [None, None, problem]
+        return problem, [st.st_mtime_ns, st.st_size, problem]
+
+    def _publish(self, catalog, references, problems, from_cache=False):
+        report_problems = []
+        episode_problems = {}
+        broken_videos = {}  # name_in_json -> [videos with a problem, videos that cannot be played]
+        for path, problem in problems.items():
+            if problem is None:
+                continue
+            refs = references[path]
+            blocks = problem_blocks_playback(problem)
+            report_problems.append({
+                'path': path,
+                'problem': problem,
+                'blocks_playback': blocks,
+                'references': [{'name_in_json': name_in_json, 'season': season_key, 'episode': episode_name,
+                                'field': field} for name_in_json, season_key, episode_name, field in refs],
+            })
+            for name_in_json, season_key, episode_name, field in refs:
+                if field == 'video_path':
+                    counts = broken_videos.setdefault(name_in_json, [0, 0])
+                    counts[0] += 1
+                    counts[1] += blocks
+                    if episode_name is not None:
+                        episode_problems[path] = (problem, blocks)
+
+        title_problems = {}
+        for name_in_json, (count, blocked) in broken_videos.items():
+            record = catalog.get(name_in_json)
+            if record is None:
+                continue
+            if record.episodes is None:
+                problem = problems[record.get('video_path')]
+                title_problems[name_in_json] = (problem, problem_blocks_playback(problem))
+            elif blocked:
+                title_problems[name_in_json] = (f"{blocked} of {len(record.episodes)} episodes cannot be played", True)
+            else:
+                title_problems[name_in_json] = (f"{count} of {len(record.episodes)} episodes may not play", False)
+
+        self._report = {'checked_files': len(problems), 'problems': report_problems, 'from_cache': from_cache}
+        self._title_problems = title_problems
+        self._episode_problems = episode_problems
+        self.generation += 1
+
+    def report(self):
+        """
+        The report of the last run ({"checked_files", "problems": [...], "from_cache"}), or None before the first
+        one. from_cache is True while it only holds the results load_cached took over from the previous session.
+        """
+        return self._report
+
+    def title_problem(self, name_in_json):
+        """(problem, blocks playback) for a title, or None."""
+        return self._title_problems.get(name_in_json)
+
+    def episode_problem(self, video_path):
+        """(problem, blocks playback) for an episode's video path, or None."""
+        return self._episode_problems.get(video_path)
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            app_log.warning("Ignoring unreadable library check cache %s: %s", self.cache_path, e)
+            return {}
+        if not isinstance(saved, dict) or saved.get('version') != LIBRARY_CHECK_VERSION:
+            return {}
+        return saved.get('files') or {}
+
+    def _save_cache(self):
+        temp_path = self.cache_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': LIBRARY_CHECK_VERSION, 'files': self._cache}, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            app_log.warning("Could not save the library check cache to %s: %s", self.cache_path, e)
+
+
+def poster_placeholder_data_uri(path):
+    """Returns a data: URI of a PNG of at most POSTER_PLACEHOLDER_MAX_SIDE pixels per side showing the image at path."""
+    from PIL import Image  # Optional dependency, and only needed on the background thread
+    with Image.open(path) as image:
+        # JPEG decoders can scale by 1/2..1/8 while decoding, which is much cheaper than decoding in full
+        image.draft('RGB', (POSTER_PLACEHOLDER_MAX_SIDE * 8, POSTER_PLACEHOLDER_MAX_SIDE * 8))
+        image = image.convert('RGB')
+        image.thumbnail((POSTER_PLACEHOLDER_MAX_SIDE, POSTER_PLACEHOLDER_MAX_SIDE))
+        image = image.quantize(POSTER_PLACEHOLDER_COLORS)
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG', optimize=True)
+    return 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+class PosterPlaceholders:
+    """
+    Placeholders for the catalog's posters (see poster_placeholder_data_uri), generated once per poster
+    on a thread pool and cached in cache_path; a poster is only decoded again when its mtime or size change.
+    Without Pillow no placeholders are generated and the grid simply shows the posters as they load.
+    """
+
+    def __init__(self, user_content_base_dir, cache_path):
+        self.user_content_base_dir = user_content_base_dir
+        self.cache_path = cache_path
+        self.generation = 0  # Incremented whenever the published placeholders change
+        self._run_lock = threading.Lock()
+        self._cache = {}  # poster path -> [mtime_ns, size, data URI]
+        self._placeholders = {}  # poster path -> data URI
+
+    def load_cached(self):
+        """Publishes the placeholders saved by an earlier run, so the first grid already has them."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            app_log.warning("Ignoring unreadable poster placeholder cache %s: %s", self.cache_path, e)
+            return
+        if isinstance(saved, dict) and saved.get('version') == POSTER_PLACEHOLDERS_VERSION:
+            self._publish(saved.get('files') or {})
+
+    def update(self, catalog):
+        """Generates the placeholders of new or changed posters and drops those of posters no longer used."""
+        try:
+            import PIL  # noqa: F401 - only checking that it is installed
+        except ImportError:
+            app_log.debug("Pillow is not installed, poster placeholders are disabled")
+            return
+        posters = sorted({record.get('poster') for record in catalog.values()
+                          if isinstance(record.get('poster'), str)
+                          and not record.get('poster').startswith(('http://', 'https://'))})
+        with self._run_lock:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=POSTER_PLACEHOLDER_WORKERS,
+                                    thread_name_prefix="PosterPlaceholders") as pool:
+                entries = dict(zip(posters, pool.map(self._entry_for, posters)))
+            cache = {path: entry for path, entry in entries.items() if entry is not None}
+            if cache != self._cache:
+                self._publish(cache)
+                self._save()
+            app_log.debug("Poster placeholders: %d posters in %.0f ms", len(cache),
+                          (time.perf_counter() - start) * 1000)
+
+    def _entry_for(self, path):
+        full_path = os.path.join(self.user_content_base_dir, path)
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            return None
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached
+        try:
+            return [st.st_mtime_ns, st.st_size, poster_placeholder_data_uri(full_path)]
+        except Exception as e:  # Pillow raises a variety of errors for unreadable or unsupported images
+            app_log.debug("No placeholder for poster %s: %s", path, e)
+            return None
+
+    def _publish(self, cache):
+        self._cache = cache
+        self._placeholders = {path: entry[2] for path, entry in cache.items()}
+        self.generation += 1
+
+    def _save(self):
+        temp_path = self.cache_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': POSTER_PLACEHOLDERS_VERSION, 'files': self._cache}, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            app_log.warning("Could not save poster placeholders to %s: %s", self.cache_path, e)
+
+    def get(self, poster_path):
+        """The placeholder data: URI for a poster path from movies.json, or None."""
+        return self._placeholders.get(poster_path)
+
+
+def contained_path(base_dir, relative_path):
+    """
+    Joins a URL-derived relative path to base_dir. Returns None when the result lies outside base_dir
+    ("..", absolute or drive paths), so requests cannot read arbitrary files - headless mode serves the LAN.
+    The check is lexical: symlinks inside the library (e.g. a media folder on a NAS) are followed as before.
+    """
+    base_dir = os.path.abspath(base_dir)
+    full_path = os.path.abspath(os.path.join(base_dir, relative_path))
+    try:
+        if os.path.commonpath((base_dir, full_path)) != base_dir:
+            return None
+    except ValueError:  # Different drives on Windows
+        return None
+    return full_path
+
+
+RANGE_DIGITS_RE = re.compile(r'[0-9]*')
+
+
+def parse_byte_ranges(range_header, file_size):
+    """
+    Parses a Range header (RFC 9110, section 14) against a file of file_size bytes.
+    Supports "first-last", open-ended "first-" and suffix "-N" ranges; last positions past the end are
+    clamped to the file size, and overlapping or adjacent ranges are coalesced.
+    Returns a sorted list of inclusive (start, end) tuples, an empty list when no range is satisfiable
+    (416), or None when the header is malformed, uses another unit or asks for too many ranges -
+    such headers are ignored and the full file is sent.
+    """
+    unit, _, range_set = range_header.partition('=')
+    if unit.strip().lower() != 'bytes' or not range_set.strip():
+        return None
+    specs = [spec.strip() for spec in range_set.split(',')]
+    specs = [spec for spec in specs if spec]  # Empty list elements are allowed by the grammar
+    if not specs or len(specs) > MAX_RANGES_PER_REQUEST:
+        return None
+
+    ranges = []
+    for spec in specs:
+        first, dash, last = spec.partition('-')
+        first, last = first.strip(), last.strip()
+        # isdigit() alone also accepts non-ASCII digits such as '²', which int() rejects
+        if not dash or not (first or last) or not RANGE_DIGITS_RE.fullmatch(first + last):
+            return None
+        if not first:  # Suffix range: the last N bytes
+            suffix_length = int(last)
+            if suffix_length > 0 and file_size > 0:
+                ranges.append((max(0, file_size - suffix_length), file_size - 1))
+            continue
+        start = int(first)
+        end = int(last) if last else file_size - 1
+        if last and end < start:
+            return None  # Syntactically invalid range-spec
+        if start < file_size:
+            ranges.append((start, min(end, file_size - 1)))
+
+    ranges.sort()
+    coalesced = []
+    for start, end in ranges:
+        if coalesced and start <= coalesced[-1][1] + 1:
+            coalesced[-1] = (coalesced[-1][0], max(coalesced[-1][1], end))
+        else:
+            coalesced.append((start, end))
+    return coalesced
+
+
+def if_range_matches(if_range, etag, mtime):
+    """
+    Evaluates an If-Range header: True when the client's validator still matches the file, so its Range
+    may be honored. Entity tags must match strongly (weak tags never do); dates must match Last-Modified.
+    """
+    if_range = if_range.strip()
+    if if_range.startswith('W/'):
+        return False
+    if if_range.startswith('"'):
+        return if_range == etag
+    try:
+        return int(parsedate_to_datetime(if_range).timestamp()) == int(mtime)
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return False
+
+
+def json_value_matches(value, expected):
+    """Checks a decoded JSON value against an HTTP_API_METHODS type: str, bool or [str]."""
+    if isinstance(expected, list):
+        return isinstance(value, list) and all(json_value_matches(item, expected[0]) for item in value)
+    return isinstance(value, expected)
+
+
+def describe_json_type(expected):
+    if isinstance(expected, list):
+        return f"a list of {describe_json_type(expected[0])}"
+    return {str: "a string", bool: "true or false"}.get(expected, expected.__name__)
+
+
+class _ClientBandwidth:
+    """Per-client state of the FairBandwidthScheduler."""
+    __slots__ = ('senders', 'tokens', 'refilled_at', 'rate', 'rate_at')
+
+    def __init__(self, now, initial_rate):
+        self.senders = 0
+        self.tokens = 0.0
+        self.refilled_at = now
+        self.rate = initial_rate  # Bytes per second, averaged over BANDWIDTH_RATE_WINDOW_SECONDS
+        self.rate_at = now
+
+    def rate_now(self, now):
+        # A client whose senders are blocked (e.g. a paused video) stops calling throttle; its rate decays
+        return self.rate * math.exp(-(now - self.rate_at) / BANDWIDTH_RATE_WINDOW_SECONDS)
+
+
+class FairBandwidthScheduler:
+    """
+    Splits a total bandwidth budget (bytes per second) between the clients that are currently receiving
+    data, per client rather than per connection, so one client streaming several files cannot starve the
+    others. Shares are max-min fair: a client receiving less than its equal share leaves the rest to the
+    others. Each client has a token bucket refilled at its current share; a sender that runs out of tokens
+    sleeps until it is back in budget.
+    """
+
+    def __init__(self, total_bytes_per_second):
+        self.total_bytes_per_second = total_bytes_per_second
+        self._lock = threading.Lock()
+        self._clients = {}  # client -> _ClientBandwidth
+
+    @contextmanager
+    def sending(self, client):
+        with self._lock:
+            state = self._clients.get(client)
+            if state is None:
+                # A new client counts as wanting its equal share until its measured rate says otherwise
+                state = _ClientBandwidth(time.monotonic(), self.total_bytes_per_second / (len(self._clients) + 1))
+                self._clients[client] = state
+            state.senders += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                state.senders -= 1
+                if state.senders == 0:
+                    del self._clients[client]
+
+    def _share(self, client, now):
+        # Water-filling: clients using less than an equal split of what is left keep their rate,
+        # and the remainder is split equally between the client and the others that want more
+        remaining = self.total_bytes_per_second
+        wanting_more = len(self._clients)
+        for rate in sorted(state.rate_now(now) for other, state in self._clients.items() if other != client):
+            if rate >= remaining / wanting_more * BANDWIDTH_SATURATED_FRACTION:
+                break
+            remaining -= rate
+            wanting_more -= 1
+        return remaining / max(1, wanting_more)
+
+    def throttle(self, client, nbytes):
+        """Accounts nbytes about to be sent to client, sleeping first if the client is over its share."""
+        with self._lock:
+            state = self._clients.get(client)
+            if state is None:
+                return
+            now = time.monotonic()
+            share = self._share(client, now)
+            state.tokens = min(state.tokens + (now - state.refilled_at) * share, share * BANDWIDTH_BURST_SECONDS)
+            state.refilled_at = now
+            state.tokens -= nbytes
+            state.rate = state.rate_now(now) + nbytes / BANDWIDTH_RATE_WINDOW_SECONDS
+            state.rate_at = now
+            delay = -state.tokens / share if state.tokens < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _OpenFile:
+    """A cached open file: its memory map (None for empty files), stat snapshot and reference count."""
+    __slots__ = ('path', 'file', 'map', 'size', 'mtime_ns', 'content_type', 'etag', 'last_modified',
+                 'checked_at', 'refs', 'retired')
+
+    def __init__(self, path, stat_result, checked_at):
+        self.path = path
+        self.size = stat_result.st_size
+        self.mtime_ns = stat_result.st_mtime_ns
+        # Strong validators for If-Range (a changed file gets a new _OpenFile, hence new validators)
+        self.etag = f'"{self.mtime_ns:x}-{self.size:x}"'
+        self.last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+        content_type, _ = mimetypes.guess_type(path)
+        self.content_type = content_type or 'application/octet-stream'  # Default for unknown types
+        self.checked_at = checked_at
+        self.refs = 0
+        self.retired = False
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        except (OSError, ValueError):
+            self.file.close()
+            raise
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+
+class OpenFileCache:
+    """
+    A small LRU of open, memory-mapped files shared by all handler threads. Stat results are
+    trusted for STAT_CACHE_TTL seconds and then revalidated by mtime and size; a file that changed
+    is reopened. Entries are reference counted so a mapping is never closed while it is being sent.
+    """
+
+    def __init__(self, max_entries=OPEN_FILE_CACHE_SIZE, stat_ttl=STAT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.stat_ttl = stat_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, path):
+        """Returns the _OpenFile for path (call release() when done), or None if it is not a regular file."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and now - entry.checked_at < self.stat_ttl:
+                entry.refs += 1
+                self._entries.move_to_end(path)
+                return entry
+
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            stat_result = None
+        with self._lock:
+            entry = self._entries.get(path)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                if entry is not None:
+                    self._retire(entry)
+                return None
+            if entry is not None and entry.mtime_ns == stat_result.st_mtime_ns and entry.size == stat_result.st_size:
+                entry.checked_at = now
+                entry.refs += 1
+                self._entries.move_to_end(path)
+                return entry
+            if entry is not None:
+                self._retire(entry)  # The file changed on disk
+
+        new_entry = _OpenFile(path, stat_result, now)
+        new_entry.refs = 1
+        with self._lock:
+            previous = self._entries.get(path)
+            if previous is not None:
+                self._retire(previous)  # Another thread opened it meanwhile; the newest one wins
+            self._entries[path] = new_entry
+            while len(self._entries) > self.max_entries:
+                self._retire(next(iter(self._entries.values())))
+        return new_entry
+
+    def release(self, entry):
+        with self._lock:
+            entry.refs -= 1
+            if entry.retired and entry.refs == 0:
+                entry.close()
+
+    def invalidate(self, entry):
+        """Forgets entry (e.g. after reading its mapping failed), so the next request stats and reopens the file."""
+        with self._lock:
+            self._retire(entry)
+
+    def _retire(self, entry):
+        # Called with the lock held: forget the entry and close it once nobody is sending from it
+        if self._entries.get(entry.path) is entry:
+            del self._entries[entry.path]
+        entry.retired = True
+        if entry.refs == 0:
+            entry.close()
+
+    def close_all(self):
+        with self._lock:
+            for entry in list(self._entries.values()):
+                self._retire(entry)
+
+
+class MovieShellHTTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Threaded HTTP server: each connection gets its own thread, so several streams (and the UI's poster
+    requests) are served at the same time. Optionally limits the concurrent connections per client address.
+    """
+    daemon_threads = True  # Connection threads must not keep the application alive
+
+    def __init__(self, server_address, handler_class, max_connections_per_client=None):
+        super().__init__(server_address, handler_class)
+        self.max_connections_per_client = max_connections_per_client
+        self._client_connections = {}
+        self._client_lock = threading.Lock()
+
+    def acquire_client_slot(self, client):
+        with self._client_lock:
+            count = self._client_connections.get(client, 0)
+            if self.max_connections_per_client and count >= self.max_connections_per_client:
+                return False
+            self._client_connections[client] = count + 1
+            return True
+
+    def release_client_slot(self, client):
+        with self._client_lock:
+            count = self._client_connections.get(client, 0) - 1
+            if count > 0:
+                self._client_connections[client] = count
+            else:
+                self._client_connections.pop(client, None)
+
+
 class MovieShellHTTPHandler(http.server.SimpleHTTPRequestHandler):
     """
     A custom HTTP request handler that serves files from specific directories.
@@ -104,12 +1751,30 @@ class MovieShellHTTPHandler(http.server.SimpleHTTPRequestHandler):
     and also serves user-supplied media from the executable's root.
     """
 
+    # Base directories used by translate_path. When left as None they are derived from how the app is run
+    # (frozen executable vs. script); MovieShellApp and the benchmarks set them explicitly.
+    bundled_base_dir = None
+    user_content_base_dir = None
+    # In-memory bundled UI assets (a BundledAssetCache). When None, they are read from disk like any other file.
+    asset_cache = None
+    # EpisodeReadAhead notified of every video request so the next episode can be warmed; None disables it
+    read_ahead = None
+    # Open, memory-mapped files shared by all requests
+    open_files = OpenFileCache()
+    # Api exposed as /api/<method> JSON endpoints (headless mode only); None answers those paths with 404
+    api = None
+    # FairBandwidthScheduler sharing a bandwidth cap between clients; None sends as fast as the network allows
+    bandwidth = None
+
     def translate_path(self, path):
         # Decode the URL path to handle spaces and special characters
         decoded_path = unquote(path)
 
         # Determine base directories based on whether running as frozen executable or script
-        if getattr(sys, 'frozen', False):
+        if self.bundled_base_dir and self.user_content_base_dir:
+            bundled_base_dir = self.bundled_base_dir
+            user_content_base_dir = self.user_content_base_dir
+        elif getattr(sys, 'frozen', False):
             # Running in a PyInstaller bundle:
             # Bundled files (html/, about_page.json) are in sys._MEIPASS
             bundled_base_dir = sys._MEIPASS
@@ -133,8 +1798,8 @@ class MovieShellHTTPHandler(http.server.SimpleHTTPRequestHandler):
             return os.path.join(bundled_base_dir, 'html', 'script.js')
         # Handle requests for other files within the 'html' directory (if any, e.g., /html/some_image.png)
         elif decoded_path.startswith('/html/'):
-            return os.path.join(bundled_base_dir,
-                                decoded_path[1:])  # e.g., /html/some_image.png -> bundled_base_dir/html/some_image.png
+            return contained_path(bundled_base_dir,
+                                  decoded_path[1:])  # e.g., /html/some_image.png -> bundled_base_dir/html/some_image.png
 
         # --- Handle Bundled about_page.json ---
         # about_page.json is now expected directly in the bundled root
@@ -149,103 +1814,415 @@ class MovieShellHTTPHandler(http.server.SimpleHTTPRequestHandler):
                 decoded_path.endswith(
                     ('.mp4', '.m4v', '.webm', '.ogg', '.mkv', '.srt', '.vtt', '.jpg', '.jpeg', '.png', '.gif')):
             # Look for these in the user_content_base_dir (next to the .exe or script)
-            full_local_path = os.path.join(user_content_base_dir,
-                                           decoded_path[1:])  # decoded_path[1:] removes leading '/'
-            return full_local_path
+            return contained_path(user_content_base_dir,
+                                  decoded_path[1:])  # decoded_path[1:] removes leading '/'
 
         # --- Handle favicon.ico and other browser-specific requests gracefully ---
         elif decoded_path == '/favicon.ico' or decoded_path.startswith('/.well-known/'):
-            logging.debug(f"Unhandled browser request: {decoded_path}")
+            self._debug("Unhandled browser request: %s", decoded_path)
             return super().translate_path(path)  # Let default handler deal with it (likely 404)
 
         # --- Fallback for any other unexpected paths ---
-        logging.warning(f"Unexpected path requested by webview: {decoded_path}")
+        http_log.warning("Unexpected path requested by webview: %s", decoded_path)
         return super().translate_path(path)
 
-    # To avoid logging each request, comment out the following method if verbose logging is not needed
-    # def log_message(self, format, *args):
-    #    pass # Uncomment this line to disable http.server's default verbose logging
+    # --- Logging ---
+    # http.server writes an access line per request straight to stderr; route it through the (sampled,
+    # asynchronous) logging pipeline instead. Errors reported by http.server are always logged.
+    _log_this_request = False
+
+    def _debug(self, msg, *args):
+        if self._log_this_request:
+            http_log.debug(msg, *args)
+
+    def log_request(self, code='-', size='-'):
+        if self._log_this_request:
+            http_log.debug('%s - "%s" %s %s', self.address_string(), self.requestline, code, size)
+
+    def log_error(self, format, *args):
+        http_log.warning("%s - %s", self.address_string(), format % args)
+
+    def log_message(self, format, *args):
+        if self._log_this_request:
+            http_log.debug("%s - %s", self.address_string(), format % args)
+
+    # --- Metrics instrumentation ---
+    _request_start = None
+    _response_status = None
+    _first_byte_recorded = False
+    _headers_sent = False  # Once set, errors can no longer be reported with a status code
+
+    def setup(self):
+        super().setup()
+        self.wfile = _CountingWriter(self.wfile)
+
+    def handle(self):
+        client = self.client_address[0]
+        acquire_slot = getattr(self.server, 'acquire_client_slot', None)
+        if acquire_slot is not None and not acquire_slot(client):
+            self._reject_busy_client()
+            return
+        metrics.gauge_add("movieshell_http_active_connections", (), 1)
+        try:
+            super().handle()
+        finally:
+            metrics.gauge_add("movieshell_http_active_connections", (), -1)
+            if acquire_slot is not None:
+                self.server.release_client_slot(client)
+
+    def _reject_busy_client(self):
+        metrics.inc("movieshell_http_rejected_connections_total")
+        http_log.warning("Refusing connection from %s: too many concurrent connections", self.client_address[0])
+        self.close_connection = True
+        try:
+            self.connection.settimeout(HEADLESS_REJECT_TIMEOUT)
+            self.raw_requestline = self.rfile.readline(65537)
+        except OSError:  # Timed out or gone; the connection is closed either way
+            return
+        if self.raw_requestline and self.parse_request():
+            self.send_response(503, "Too many connections from this client")
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.send_header("Connection", "close")
+            self.end_headers()
+
+    def send_response(self, code, message=None):
+        self._response_status = code
+        super().send_response(code, message)
+
+    def end_headers(self):
+        super().end_headers()
+        self._headers_sent = True
+        if self._request_start is not None and not self._first_byte_recorded:
+            self._first_byte_recorded = True
+            metrics.observe("movieshell_http_time_to_first_byte_seconds", (('route', self._metrics_route),),
+                            time.perf_counter() - self._request_start)
 
     def do_GET(self):
+        self._handle_instrumented(self._route_get)
+
+    def do_POST(self):
+        self._handle_instrumented(self._route_post)
+
+    def _route_get(self):
+        url_path = unquote(self.path.split('?', 1)[0])
+        cached_asset = self.asset_cache.get(url_path) if self.asset_cache is not None else None
+        if self._metrics_route == 'metrics':
+            self._serve_metrics()
+        elif self._metrics_route == 'api':
+            self._serve_api(url_path)
+        elif cached_asset is not None:
+            self._serve_cached_asset(cached_asset)
+        else:
+            self._serve_file()
+
+    def _route_post(self):
+        if self._metrics_route == 'api':
+            self._serve_api(unquote(self.path.split('?', 1)[0]))
+        else:
+            self.send_error(405, "Method Not Allowed")
+
+    def _handle_instrumented(self, serve):
+        """Runs serve() for the current request, recording the request metrics around it."""
+        self._log_this_request = http_request_sampler.should_log() and http_log.isEnabledFor(logging.DEBUG)
+        self._request_start = time.perf_counter()
+        self._response_status = None
+        self._first_byte_recorded = False
+        self._metrics_route = classify_route(unquote(self.path))
+        bytes_before = self.wfile.bytes_written
+        try:
+            serve()
+        finally:
+            status = self._response_status or 0
+            if status >= 400:
+                kind = 'error'
+            elif status == 206:
+                kind = 'range'
+            else:
+                kind = 'full'
+            route_label = (('route', self._metrics_route),)
+            metrics.inc("movieshell_http_requests_total", route_label + (('status', status), ('kind', kind)))
+            metrics.inc("movieshell_http_bytes_sent_total", route_label, self.wfile.bytes_written - bytes_before)
+            metrics.observe("movieshell_http_request_duration_seconds", route_label,
+                            time.perf_counter() - self._request_start)
+            self._request_start = None
+
+    def _serve_api(self, url_path):
+        """
+        /api lists the available methods; /api/<method> calls an Api method. Arguments are passed as a
+        JSON array in the POST body. The methods already return JSON, which is sent as is (compressed when large).
+        """
+        if self.api is None:
+            self.send_error(404, "File Not Found")
+            return
+        method_name = url_path[len('/api/'):] if url_path.startswith('/api/') else ''
+        if not method_name:
+            self.send_bytes(json.dumps(list(HTTP_API_METHODS)).encode('utf-8'), "application/json; charset=utf-8")
+            return
+        if method_name not in HTTP_API_METHODS:
+            self.send_error(404, "Unknown API method")
+            return
+
+        args = []
+        if self.command == 'POST':
+            try:
+                content_length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                content_length = -1
+            if content_length < 0 or content_length > HTTP_API_MAX_BODY:
+                self.send_error(413 if content_length > 0 else 400, "Invalid request body")
+                return
+            try:
+                args = json.loads(self.rfile.read(content_length) or b'[]')
+            except ValueError:
+                args = None
+            if not isinstance(args, list):
+                self.send_error(400, "Expected a JSON array of arguments")
+                return
+
+        method = getattr(self.api, method_name)
+        try:
+            inspect.signature(method).bind(*args)
+        except TypeError as e:
+            self.send_error(400, f"Bad arguments for {method_name}: {e}")
+            return
+        for arg, expected in zip(args, HTTP_API_METHODS[method_name]):
+            if not json_value_matches(arg, expected):
+                self.send_error(400, f"Bad arguments for {method_name}: expected {describe_json_type(expected)}")
+                return
+
+        try:
+            result = method(*args)
+        except Exception as e:
+            http_log.error("API call %s failed: %s", method_name, e, exc_info=True)
+            self.send_error(500, "Internal Server Error")
+            return
+        self.send_bytes(result.encode('utf-8'), "application/json; charset=utf-8")
+
+    def _serve_metrics(self):
+        # Metrics are only exposed to the local machine
+        if self.client_address[0] not in ('127.0.0.1', '::1'):
+            self.send_error(403, "Forbidden")
+            return
+        self.send_bytes(metrics.render_prometheus().encode('utf-8'), "text/plain; version=0.0.4; charset=utf-8")
+
+    def send_bytes(self, body, content_type, status=200):
+        """
+        Sends an in-memory response body, gzip-compressing it on the fly when it is compressible,
+        at least COMPRESSION_MIN_SIZE bytes and the client accepts gzip.
+        """
+        encoding = 'identity'
+        if len(body) >= COMPRESSION_MIN_SIZE and content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+            encoding = choose_content_encoding(self.headers.get('Accept-Encoding'), ('gzip',))
+            if encoding == 'gzip':
+                body = gzip.compress(body, compresslevel=6)
+        self.send_response(status)
+        self.send_header("Content-type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding != 'identity':
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve_cached_asset(self, asset):
+        # no-cache: the webview revalidates on every load, which costs a 304 instead of a full transfer
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            client_etags = {tag.strip() for tag in if_none_match.split(',')}
+            for encoding, etag in asset.etags.items():
+                if etag in client_etags or '*' in client_etags:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Cache-Control", "no-cache")
+                    self.send_header("Vary", "Accept-Encoding")
+                    self.end_headers()
+                    return
+
+        encoding = choose_content_encoding(self.headers.get('Accept-Encoding'), asset.bodies.keys())
+        body = asset.bodies[encoding]
+        self.send_response(200)
+        self.send_header("Content-type", asset.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", asset.etags[encoding])
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding != 'identity':
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        self.wfile.write(body)
+        self._debug("Served cached asset %s (%s, %d bytes)", self.path, encoding, len(body))
+
+    def _serve_file(self):
         # This is where the path translation happens and files are served
         path = self.translate_path(self.path)
+        if path is None:  # Outside the library and the bundled files, e.g. /images/../../secret.txt
+            http_log.warning("Refusing path outside the served folders: %s", self.path)
+            self.send_error(404, "File Not Found")
+            return
 
-        logging.debug(f"Attempting to serve requested URL: {self.path}")  # Log the original URL
-        logging.debug(f"Translated local file path: {path}")  # Log the translated local path
+        self._debug("Attempting to serve requested URL: %s", self.path)  # Log the original URL
+        self._debug("Translated local file path: %s", path)  # Log the translated local path
 
-        if not os.path.exists(path) or not os.path.isfile(path):
-            logging.debug(f"File not found: {path}")
+        # One cached stat (revalidated by mtime) replaces exists/isfile/getsize/open/seek per request
+        try:
+            open_file = self.open_files.acquire(path)
+        except OSError as e:
+            http_log.warning("Could not open %s: %s", path, e)
+            open_file = None
+        if open_file is None:
+            self._debug("File not found: %s", path)
             self.send_error(404, "File Not Found")
             return
 
+        self._headers_sent = False
         try:
-            # Guess the MIME type
-            ctype, _ = mimetypes.guess_type(path)
-            if ctype is None:
-                ctype = 'application/octet-stream'  # Default for unknown types
+            ctype = open_file.content_type
+            self._debug("Guessed MIME type for %s: %s", self.path, ctype)
 
-            logging.debug(f"Guessed MIME type for {self.path}: {ctype}")
+            if self.read_ahead is not None and ctype.startswith('video/'):
+                self.read_ahead.on_media_request(path)
 
-            file_size = os.path.getsize(path)
+            file_size = open_file.size
+            ranges = None
             range_header = self.headers.get('Range')
-
-            if range_header and ctype.startswith('video/'):
-                # Handle Range requests for video files
-                logging.debug(f"Received Range header: {range_header}")
-                match = re.match(r'bytes=(\d*)-(\d*)', range_header)
-                if match:
-                    start_byte = int(match.group(1)) if match.group(1) else 0
-                    end_byte = int(match.group(2)) if match.group(2) else file_size - 1
-
-                    if start_byte >= file_size:
-                        self.send_error(416, "Range Not Satisfiable")
-                        return
-
-                    length = end_byte - start_byte + 1
-
-                    self.send_response(206)  # Partial Content
-                    self.send_header("Content-type", ctype)
-                    self.send_header("Content-Range", f"bytes {start_byte}-{end_byte}/{file_size}")
-                    self.send_header("Content-Length", str(length))
-                    self.send_header("Accept-Ranges", "bytes")
-                    self.end_headers()
-
-                    with open(path, 'rb') as f:
-                        f.seek(start_byte)
-                        self.wfile.write(f.read(length))
-                    logging.debug(
-                        f"Served partial content: bytes {start_byte}-{end_byte} of {file_size} for {self.path}")
+            if range_header:
+                self._debug("Received Range header: %s", range_header)
+                if_range = self.headers.get('If-Range')
+                if if_range and not if_range_matches(if_range, open_file.etag, open_file.mtime_ns / 1e9):
+                    self._debug("If-Range validator %s no longer matches, sending the full file", if_range)
                 else:
-                    logging.warning(f"Invalid Range header format: {range_header}")
-                    self.send_error(400, "Bad Request")  # Malformed Range header
-            else:
+                    ranges = parse_byte_ranges(range_header, file_size)
+                    if ranges is None:
+                        self._debug("Ignoring unsupported or malformed Range header: %s", range_header)
+
+            if ranges is None:
                 # Serve full file
                 self.send_response(200)
-                self.send_header("Content-type", ctype)
-                self.send_header("Content-Length", str(file_size))
-                self.send_header("Accept-Ranges", "bytes")  # Indicate server supports ranges
+                self._send_file_headers(open_file, ctype, file_size)
                 self.end_headers()
 
-                with open(path, 'rb') as f:
-                    self.copyfile(f, self.wfile)
-                logging.debug(f"Served full file: {self.path}")
+                self._send_file_slice(open_file, 0, file_size)
+                self._debug("Served full file: %s", self.path)
+            elif not ranges:
+                self.send_response(416, "Range Not Satisfiable")
+                self.send_header("Content-Range", f"bytes */{file_size}")
+                self.send_header("Content-Length", "0")
+                self.send_header("Accept-Ranges", "bytes")
+                self.end_headers()
+            elif len(ranges) == 1:
+                start_byte, end_byte = ranges[0]
+                length = end_byte - start_byte + 1
+                self.send_response(206)  # Partial Content
+                self._send_file_headers(open_file, ctype, length)
+                self.send_header("Content-Range", f"bytes {start_byte}-{end_byte}/{file_size}")
+                self.end_headers()
+
+                self._send_file_slice(open_file, start_byte, length)
+                self._debug("Served partial content: bytes %d-%d of %d for %s",
+                            start_byte, end_byte, file_size, self.path)
+            else:
+                self._send_multipart_ranges(open_file, ctype, ranges)
 
         except ConnectionAbortedError:
-            logging.debug(f"Client aborted connection while serving {self.path}")
+            self._debug("Client aborted connection while serving %s", self.path)
         except ConnectionResetError:
-            logging.debug(f"Client reset connection while serving {self.path}")
+            self._debug("Client reset connection while serving %s", self.path)
+        except TimeoutError:
+            self._debug("Client stopped reading while serving %s", self.path)
+            self.close_connection = True
         except Exception as e:
-            logging.error(f"Error serving {self.path}: {e}", exc_info=True)  # exc_info=True to log full traceback
-            self.send_error(500, "Internal Server Error")
+            http_log.error("Error serving %s: %s", self.path, e, exc_info=True)  # exc_info=True to log full traceback
+            self.open_files.invalidate(open_file)  # E.g. truncated on disk within STAT_CACHE_TTL
+            if self._headers_sent:
+                # The status line is already out; an error page would become part of the body
+                self.close_connection = True
+            else:
+                self.send_error(500, "Internal Server Error")
+        finally:
+            self.open_files.release(open_file)
+
+    def _send_file_headers(self, open_file, ctype, content_length):
+        self.send_header("Content-type", ctype)
+        self.send_header("Content-Length", str(content_length))
+        self.send_header("Accept-Ranges", "bytes")  # Indicate server supports ranges
+        self.send_header("ETag", open_file.etag)
+        self.send_header("Last-Modified", open_file.last_modified)
+
+    def _send_multipart_ranges(self, open_file, ctype, ranges):
+        """Sends several ranges in one multipart/byteranges response (e.g. a player fetching header and moov)."""
+        boundary = uuid.uuid4().hex
+        part_headers = [
+            (f"\r\n--{boundary}\r\nContent-Type: {ctype}\r\n"
+             f"Content-Range: bytes {start}-{end}/{open_file.size}\r\n\r\n").encode('latin-1')
+            for start, end in ranges
+        ]
+        closing = f"\r\n--{boundary}--\r\n".encode('latin-1')
+        content_length = sum(len(h) for h in part_headers) + sum(end - start + 1 for start, end in ranges)
+        content_length += len(closing)
+
+        self.send_response(206)  # Partial Content
+        self._send_file_headers(open_file, f"multipart/byteranges; boundary={boundary}", content_length)
+        self.end_headers()
+        for part_header, (start, end) in zip(part_headers, ranges):
+            self.wfile.write(part_header)
+            self._send_file_slice(open_file, start, end - start + 1)
+        self.wfile.write(closing)
+        self._debug("Served %d ranges of %s as multipart/byteranges", len(ranges), self.path)
+
+    def _send_file_slice(self, open_file, start, length):
+        """Writes length bytes starting at start straight from the file's memory map (no intermediate copies)."""
+        if open_file.map is None or length <= 0:
+            return
+        bandwidth = self.bandwidth
+        client = self.client_address[0]
+        with memoryview(open_file.map) as view, (bandwidth.sending(client) if bandwidth else nullcontext()):
+            end = min(start + length, open_file.size)
+            for offset in range(start, end, SEND_CHUNK_BYTES):
+                with view[offset:min(offset + SEND_CHUNK_BYTES, end)] as chunk:
+                    if bandwidth is not None:
+                        bandwidth.throttle(client, len(chunk))
+                    self.wfile.write(chunk)
+
+
+def create_http_server(address, handler, max_connections_per_client=None):
+    """
+    Creates (but does not start) the HTTP server used to serve the UI and the media library.
+    Shared by MovieShellApp and Benchmark.py so the benchmarks always measure the real server setup.
+    """
+    return MovieShellHTTPServer(address, handler, max_connections_per_client=max_connections_per_client)
 
 
 class Api:
-    def __init__(self, media_data, http_server_port, user_content_base_dir):  # Added user_content_base_dir
-        self.media_data = media_data
+    def __init__(self, media_data, http_server_port, user_content_base_dir, catalog_ready=None,
+                 public_base_url=None, subtitle_index=None, library_check=None, poster_placeholders=None):
+        # media_data (a Catalog) may still be loading on the catalog loader thread; catalog_ready (a threading.Event)
+        # is set once it is complete, and every access through the media_data property waits for it.
+        self._media_data = media_data
+        self._catalog_ready = catalog_ready
         self.http_server_port = http_server_port
         self.user_content_base_dir = user_content_base_dir  # Store it
-        logging.debug(
-            f"API initialized with HTTP server port: {self.http_server_port}, user_content_base_dir: {self.user_content_base_dir}")
+        # Prefix of the media URLs handed to the UI. The desktop window talks to localhost; LAN browsers in
+        # headless mode get root-relative URLs (public_base_url='') so they resolve against whatever host they used.
+        self.public_base_url = f"http://localhost:{http_server_port}" if public_base_url is None else public_base_url
+        self.startup_report_path = os.path.join(user_content_base_dir, STARTUP_PROFILE_FILENAME)
+        self.subtitle_index = subtitle_index  # SubtitleIndex used by search_dialogue, or None
+        # LibraryCheck whose results mark unplayable titles and episodes, or None
+        self.library_check = library_check
+        self.poster_placeholders = poster_placeholders  # PosterPlaceholders included in get_all_media, or None
+        self._cached_generations = None
+        # Processed get_media_details results (JSON strings) in least-recently-used order
+        self._details_cache = OrderedDict()
+        self._details_cache_lock = threading.Lock()
+        # Processed get_season_episodes results (JSON strings), keyed by (name_in_json, season_key), in
+        # least-recently-used order
+        self._season_cache = OrderedDict()
+        self._season_cache_lock = threading.Lock()
+        # get_all_media result (JSON string); the catalog does not change once loaded, but the library check
+        # results and poster placeholders included in them do, so all three caches are dropped when those change
+        self._all_media_json = None
+        api_log.debug("API initialized with HTTP server port: %s, user_content_base_dir: %s",
+                      self.http_server_port, self.user_content_base_dir)
 
         # Determine the base directory for bundled resources (where about_page.json is)
         if getattr(sys, 'frozen', False):
@@ -255,7 +2232,13 @@ class Api:
 
         self.about_json_path = os.path.join(bundled_base_dir,
                                             'about_page.json')  # about_page.json is now directly in bundled root
-        logging.debug(f"About JSON path set to: {self.about_json_path}")
+        api_log.debug("About JSON path set to: %s", self.about_json_path)
+
+    @property
+    def media_data(self):
+        if self._catalog_ready is not None:
+            self._catalog_ready.wait()
+        return self._media_data
 
     def _get_full_http_url(self, relative_path):
         """
@@ -271,34 +2254,130 @@ class Api:
         # If the path is for about_page.json, it's bundled directly in the executable's root
         if relative_path == 'about_page.json':  # Check for exact filename
             encoded_path = quote(relative_path)  # Just encode the filename
-            return f"http://localhost:{self.http_server_port}/{encoded_path}"
+            return f"{self.public_base_url}/{encoded_path}"
         else:
             # For all other relative paths (images, movies, series, trailers, subtitles),
             # assume they are user-supplied and should be served directly from the root of the HTTP server
             # (which is the executable's directory or the script's directory during dev).
             # The relative_path from movies.json should be like "images/poster.png", "movies/my_movie.mp4", "subtitles/movie_en.srt"
             encoded_path = '/'.join(quote(part) for part in relative_path.split(os.sep))
-            return f"http://localhost:{self.http_server_port}/{encoded_path}"
+            return f"{self.public_base_url}/{encoded_path}"
 
+    def _sync_caches(self):
+        """Drops the cached results if the library check or the poster placeholders changed since they were built."""
+        generations = (self.library_check.generation if self.library_check is not None else None,
+                       self.poster_placeholders.generation if self.poster_placeholders is not None else None)
+        if generations == self._cached_generations:
+            return
+        with self._details_cache_lock, self._season_cache_lock:
+            self._cached_generations = generations
+            self._details_cache.clear()
+            self._season_cache.clear()
+            self._all_media_json = None
+
+    def _title_problem(self, name_in_json):
+        return self.library_check.title_problem(name_in_json) if self.library_check is not None else None
+
+    def _grid_item(self, name_in_json, record):
+        """The summary of a title shown on the poster grid (series carry their season summary, not episodes)."""
+        item = record.to_dict()
+        if self.poster_placeholders is not None and self.poster_placeholders.get(item.get('poster')):
+            item['poster_placeholder'] = self.poster_placeholders.get(item.get('poster'))
+        item['poster'] = self._get_full_http_url(item.get('poster'))
+        # Ensure 'title' is always present, using name_in_json as fallback
+        item['title'] = item.get('title', name_in_json)
+        item['has_video'] = self._is_video_file(item.get('video_path'))
+        item['name_in_json'] = name_in_json
+        if record.episodes is not None:
+            item['seasons'] = record.episodes.season_summary()
+        self._add_problem(item, self._title_problem(name_in_json))
+        return item
+
+    @staticmethod
+    def _add_problem(item, found):
+        """
+        Marks a title or episode the library check found a problem with (found is (problem, blocks playback)).
+        Only missing, empty or unreadable files take the video away; other problems are warnings.
+        """
+        if found:
+            problem, blocks = found
+            item['problem'] = problem
+            item['problem_blocks_playback'] = blocks
+            if blocks and item.get('type') != 'series':
+                item['has_video'] = False
+
+    @timed_api_method
     def get_all_media(self):
-        logging.debug("get_all_media called, returning items.")
-        items_to_return = []
-        for name_in_json, media_item in self.media_data.items():
-            item_copy = media_item.copy()
-            item_copy['poster'] = self._get_full_http_url(item_copy.get('poster'))
-            # Ensure 'title' is always present, using name_in_json as fallback
-            item_copy['title'] = item_copy.get('title', name_in_json)
-            item_copy['has_video'] = self._is_video_file(item_copy.get('video_path'))
-            item_copy['name_in_json'] = name_in_json
-            items_to_return.append(item_copy)
-        logging.debug(f"get_all_media returning {len(items_to_return)} items.")
-        return json.dumps(items_to_return)
-
+        api_log.debug("get_all_media called, returning items.")
+        self._sync_caches()
+        if self._all_media_json is None:
+            items_to_return = [self._grid_item(name_in_json, record)
+                               for name_in_json, record in self.media_data.items()]
+            api_log.debug("get_all_media built %s items.", len(items_to_return))
+            self._all_media_json = json.dumps(items_to_return)
+        return self._all_media_json
+
+    def _derive_subtitle_path(self, video_path_relative):
+        """
+        Subtitles are not listed in movies.json: a video has subtitles when an .srt file with the same
+        base name sits next to it. Returns that file's path relative to user_content_base_dir, or None.
+        """
+        if not video_path_relative or video_path_relative.startswith(('http://', 'https://')):
+            return None
+        # Construct the full local file path for the video to get its base name
+        full_video_local_path = os.path.join(self.user_content_base_dir, video_path_relative)
+        # Derive potential subtitle path by changing extension to .srt
+        potential_subtitle_local_path = os.path.splitext(full_video_local_path)[0] + '.srt'
+        # Check if the .srt file actually exists on the filesystem
+        if os.path.exists(potential_subtitle_local_path):
+            # If it exists, derive its relative path from user_content_base_dir
+            derived_subtitle_path_relative = os.path.relpath(potential_subtitle_local_path,
+                                                             self.user_content_base_dir)
+            api_log.debug("Found existing subtitle: %s", derived_subtitle_path_relative)
+            return derived_subtitle_path_relative
+        api_log.debug("No subtitle found at: %s", potential_subtitle_local_path)
+        return None
+
+    @timed_api_method
     def get_media_details(self, name_in_json):
-        logging.debug(f"get_media_details called for: {name_in_json}")
+        """
+        Returns the details of one movie or series. For a series only a slim summary of its seasons
+        ({season_key: {"episode_count": n}}) is included - episodes are fetched one season at a time
+        through get_season_episodes, so opening a long-running show costs about as much as opening a movie.
+        """
+        api_log.debug("get_media_details called for: %s", name_in_json)
+        return self._get_media_details_json(name_in_json)
+
+    @timed_api_method
+    def get_media_details_many(self, names_in_json):
+        """
+        Batch version of get_media_details used by the UI to prefetch the details of the cards
+        in or near the viewport. Returns a JSON object mapping each name to its details (or null).
+        """
+        names = list(dict.fromkeys(names_in_json or []))[:DETAILS_BATCH_LIMIT]
+        api_log.debug("get_media_details_many called for %d items", len(names))
+        # The details are cached as JSON already, so the result is assembled without re-encoding them
+        return '{' + ', '.join(f'{json.dumps(name)}: {self._get_media_details_json(name)}' for name in names) + '}'
+
+    def _get_media_details_json(self, name_in_json):
+        self._sync_caches()
+        with self._details_cache_lock:
+            cached = self._details_cache.get(name_in_json)
+            if cached is not None:
+                self._details_cache.move_to_end(name_in_json)
+                return cached
+
+        result = self._build_media_details_json(name_in_json)
+        with self._details_cache_lock:
+            self._details_cache[name_in_json] = result
+            while len(self._details_cache) > DETAILS_CACHE_SIZE:
+                self._details_cache.popitem(last=False)
+        return result
+
+    def _build_media_details_json(self, name_in_json):
         media_item = self.media_data.get(name_in_json)
         if media_item:
-            details = media_item.copy()
+            details = media_item.to_dict()
             details['name_in_json'] = name_in_json
             # Ensure 'title' is always present, using name_in_json as fallback
             details['title'] = details.get('title', name_in_json)
@@ -309,84 +2388,81 @@ class Api:
             details['trailer_path'] = self._get_full_http_url(details.get('trailer_path'))
             details['has_trailer'] = bool(details.get('trailer_path'))
 
-            # NEW SUBTITLE DERIVATION LOGIC
-            derived_subtitle_path_relative = None
-            original_video_path_relative = media_item.get('video_path')
-
-            if original_video_path_relative:
-                # Construct the full local file path for the video to get its base name
-                full_video_local_path = os.path.join(self.user_content_base_dir, original_video_path_relative)
-
-                # Derive potential subtitle path by changing extension to .srt
-                base_name_without_ext = os.path.splitext(full_video_local_path)[0]
-                potential_subtitle_local_path = base_name_without_ext + '.srt'
+            derived_subtitle_path_relative = self._derive_subtitle_path(media_item.get('video_path'))
+            details['subtitle_path'] = self._get_full_http_url(derived_subtitle_path_relative)
+            details['has_subtitles'] = bool(derived_subtitle_path_relative)
 
-                # Check if the .srt file actually exists on the filesystem
-                if os.path.exists(potential_subtitle_local_path):
-                    # If it exists, derive its relative path from user_content_base_dir
-                    derived_subtitle_path_relative = os.path.relpath(potential_subtitle_local_path,
-                                                                     self.user_content_base_dir)
-                    logging.debug(f"Found existing subtitle: {derived_subtitle_path_relative}")
-                else:
-                    logging.debug(f"No subtitle found at: {potential_subtitle_local_path}")
+            if media_item.episodes is not None:
+                details['seasons'] = media_item.episodes.season_summary()
+            self._add_problem(details, self._title_problem(name_in_json))
 
-            details['subtitle_path'] = self._get_full_http_url(derived_subtitle_path_relative)
-            details['has_subtitles'] = bool(derived_subtitle_path_relative and os.path.exists(
-                os.path.join(self.user_content_base_dir, derived_subtitle_path_relative)))
-
-            if details.get('type') == 'series' and 'seasons' in details:
-                for season_num, season_data in details['seasons'].items():
-                    if 'episodes' in season_data:
-                        for episode_name, episode_details in season_data['episodes'].items():
-                            original_episode_video_path_relative = episode_details.get('video_path')
-                            derived_episode_subtitle_path_relative = None
-                            if original_episode_video_path_relative:
-                                full_episode_video_local_path = os.path.join(self.user_content_base_dir,
-                                                                             original_episode_video_path_relative)
-                                base_name_without_ext = os.path.splitext(full_episode_video_local_path)[0]
-                                potential_episode_subtitle_local_path = base_name_without_ext + '.srt'
-                                if os.path.exists(potential_episode_subtitle_local_path):
-                                    derived_episode_subtitle_path_relative = os.path.relpath(
-                                        potential_episode_subtitle_local_path, self.user_content_base_dir)
-                                    logging.debug(
-                                        f"Found existing episode subtitle: {derived_episode_subtitle_path_relative}")
-                                else:
-                                    logging.debug(
-                                        f"No episode subtitle found at: {potential_episode_subtitle_local_path}")
-
-                            episode_details['video_path'] = self._get_full_http_url(
-                                original_episode_video_path_relative)  # Keep original video path
-                            episode_details['has_video'] = self._is_video_file(
-                                original_episode_video_path_relative)  # Check original video path
-                            episode_details['subtitle_path'] = self._get_full_http_url(
-                                derived_episode_subtitle_path_relative)
-                            episode_details['has_subtitles'] = bool(
-                                derived_episode_subtitle_path_relative and os.path.exists(
-                                    os.path.join(self.user_content_base_dir, derived_episode_subtitle_path_relative)))
-
-            logging.debug(f"Details for {name_in_json} found and processed.")
+            api_log.debug("Details for %s found and processed.", name_in_json)
             return json.dumps(details)
-        logging.debug(f"Details for {name_in_json} not found.")
+        api_log.debug("Details for %s not found.", name_in_json)
         return json.dumps(None)
 
+    @timed_api_method
+    def get_season_episodes(self, name_in_json, season_key):
+        """
+        Returns {"season": season_key, "episodes": {...}} for one season of a series, with playable
+        video URLs and derived subtitle paths. Results are cached per season.
+        """
+        api_log.debug("get_season_episodes called for: %s, season %s", name_in_json, season_key)
+        cache_key = (name_in_json, str(season_key))
+        self._sync_caches()
+        with self._season_cache_lock:
+            cached = self._season_cache.get(cache_key)
+            if cached is not None:
+                self._season_cache.move_to_end(cache_key)
+        if cached is not None:
+            return cached
+
+        media_item = self.media_data.get(name_in_json)
+        episode_table = media_item.episodes if media_item else None
+        season_episodes = episode_table.season_episodes(season_key) if episode_table is not None else None
+        if season_episodes is None:
+            api_log.debug("Season %s of %s not found.", season_key, name_in_json)
+            return json.dumps(None)
+
+        episodes = {}
+        for episode_name, episode in season_episodes:  # Fresh dicts, built from the episode table
+            original_episode_video_path_relative = episode.get('video_path')
+            derived_episode_subtitle_path_relative = self._derive_subtitle_path(original_episode_video_path_relative)
+            episode['video_path'] = self._get_full_http_url(original_episode_video_path_relative)
+            episode['has_video'] = self._is_video_file(original_episode_video_path_relative)
+            episode['subtitle_path'] = self._get_full_http_url(derived_episode_subtitle_path_relative)
+            episode['has_subtitles'] = bool(derived_episode_subtitle_path_relative)
+            if self.library_check is not None:
+                self._add_problem(episode, self.library_check.episode_problem(original_episode_video_path_relative))
+            episodes[episode_name] = episode
+
+        result = json.dumps({'season': str(season_key), 'episodes': episodes})
+        with self._season_cache_lock:
+            self._season_cache[cache_key] = result
+            while len(self._season_cache) > DETAILS_CACHE_SIZE:
+                self._season_cache.popitem(last=False)
+        api_log.debug("Season %s of %s processed (%d episodes).", season_key, name_in_json, len(episodes))
+        return result
+
+    @timed_api_method
     def get_about_info(self):
         """
         Reads and returns the content of the about.json file.
         """
-        logging.debug(f"get_about_info called. Attempting to read from: {self.about_json_path}")
+        api_log.debug("get_about_info called. Attempting to read from: %s", self.about_json_path)
         try:
             with open(self.about_json_path, 'r', encoding='utf-8') as f:
                 about_data = json.load(f)
-            logging.debug("Successfully loaded about.json.")
+            api_log.debug("Successfully loaded about.json.")
             return json.dumps(about_data)
         except FileNotFoundError:
-            logging.error(f"about.json not found at {self.about_json_path}")
+            api_log.error("about.json not found at %s", self.about_json_path)
             return json.dumps({"error": "About information file not found."})
         except json.JSONDecodeError:
-            logging.error(f"Could not decode about.json at {self.about_json_path}")
+            api_log.error("Could not decode about.json at %s", self.about_json_path)
             return json.dumps({"error": f"Error reading about information file."})
         except Exception as e:
-            logging.error(f"An unexpected error occurred while reading about.json: {e}")
+            api_log.error("An unexpected error occurred while reading about.json: %s", e)
             return json.dumps({"error": f"An unexpected error occurred: {e}"})
 
     def _is_video_file(self, file_path):
@@ -402,28 +2478,98 @@ class Api:
                 return True
         return False
 
+    @timed_api_method
     def search_media(self, query):
-        logging.debug(f"search_media called for query: '{query}'")
+        api_log.debug("search_media called for query: '%s'", query)
         query_lower = (query or "").lower()
         found_media = []
-        for name_in_json, details in self.media_data.items():
+        for name_in_json, record in self.media_data.items():
             # Ensure 'title' is consistently available for search
-            item_title = details.get('title', name_in_json)
-            if query_lower in item_title.lower() or \
-                    (details.get("description") and query_lower in details["description"].lower()):
-                item_copy = details.copy()
-                item_copy['poster'] = self._get_full_http_url(item_copy.get('poster'))
-                item_copy['name_in_json'] = name_in_json
-                # Ensure 'title' is added to the returned item
-                item_copy['title'] = item_copy.get('title', name_in_json)
-                found_media.append(item_copy)
-        logging.debug(f"Search returned {len(found_media)} items for query: '{query}'")
+            item_title = record.get('title', name_in_json)
+            description = record.get('description')
+            if query_lower in item_title.lower() or (description and query_lower in description.lower()):
+                found_media.append(self._grid_item(name_in_json, record))
+        api_log.debug("Search returned %s items for query: '%s'", len(found_media), query)
         return json.dumps(found_media)
 
+    @timed_api_method
+    def search_dialogue(self, query):
+        """
+        Finds the moments whose subtitles contain every word of query. Each hit carries what playMedia
+        needs to start right there: the video and subtitle URLs, a player title and the start time in seconds.
+        """
+        api_log.debug("search_dialogue called for query: '%s'", query)
+        if self.subtitle_index is None:
+            return json.dumps([])
+        catalog = self.media_data
+        results = []
+        season_episodes = {}  # (name_in_json, season_key) -> {episode name: episode}, hits cluster by season
+        for hit in self.subtitle_index.search(query):
+            record = catalog.get(hit['name_in_json'])
+            if record is None:
+                continue
+            title = record.get('title', hit['name_in_json'])
+            video_path = os.path.splitext(hit['srt_path'])[0]
+            # The index only knows the .srt; the catalog has the video's real extension
+            if hit['episode'] is not None:
+                season_id = (hit['name_in_json'], hit['season'])
+                if season_id not in season_episodes:
+                    season_episodes[season_id] = dict(record.episodes.season_episodes(hit['season']) or ())
+                episode = season_episodes[season_id].get(hit['episode']) or {}
+                video_path = episode.get('video_path', video_path)
+                season_label = hit['season'][:1].upper() + hit['season'][1:]  # Same label as the episode list
+                player_title = f"{title} - {season_label} - {episode.get('title') or hit['episode']}"
+            else:
+                video_path = record.get('video_path', video_path)
+                player_title = title
+            results.append({
+                'name_in_json': hit['name_in_json'],
+                'title': title,
+                'season': hit['season'],
+                'episode': hit['episode'],
+                'player_title': player_title,
+                'start': hit['start'],
+                'text': hit['text'],
+                'video_path': self._get_full_http_url(video_path),
+                'subtitle_path': self._get_full_http_url(hit['srt_path']),
+            })
+        api_log.debug("Dialogue search returned %s hits for query: '%s'", len(results), query)
+        return json.dumps(results)
+
+    @timed_api_method
+    def get_library_report(self):
+        """
+        Returns the findings of the last library check: {"checked_files": n, "problems": [{"path", "problem",
+        "blocks_playback", "references": [{"name_in_json", "season", "episode", "field"}]}], "from_cache": bool},
+        or null before it ran. from_cache is true until this session's check has finished.
+        """
+        return json.dumps(self.library_check.report() if self.library_check is not None else None)
+
+    @timed_api_method
+    def check_library(self, probe=True):
+        """
+        Re-checks the library now and returns the report. Files unchanged since the last check are only
+        stat'ed; with probe=False no file headers are read at all.
+        """
+        if self.library_check is None:
+            return json.dumps(None)
+        return json.dumps(self.library_check.run(self.media_data, probe=bool(probe)))
+
+    @timed_api_method
+    def report_startup_event(self, event_name):
+        """
+        Called by the UI to record startup milestones (e.g. 'first_poster') in the startup trace.
+        The report is (re)written once the first poster has been painted.
+        """
+        if startup_profiler.mark(event_name) and event_name == 'first_poster':
+            startup_profiler.write_report(self.startup_report_path)
+        return json.dumps(startup_profiler.enabled)
+
     def show_devtools(self):
-        logging.debug("Python: show_devtools method CALLED from JavaScript.")
+        import webview  # Already loaded by MovieShellApp.run(), so this is just a lookup
+        api_log.debug("Python: show_devtools method CALLED from JavaScript.")
         if webview.windows:  # Check if there's an active window
-            logging.debug("Python: Attempting to simulate F12 key press to open devtools.")
+            api_log.debug("Python: Attempting to simulate F12 key press to open devtools.")
             # Simulate F12 key press to toggle dev tools
             # This is a common workaround when direct API calls like show_devtools() are not available
             webview.windows[0].evaluate_js("""
@@ -436,13 +2582,13 @@ class Api:
                     cancelable: true
                 }));
             """)
-            logging.debug("Python: F12 key press simulated via evaluate_js.")
+            api_log.debug("Python: F12 key press simulated via evaluate_js.")
         else:
-            logging.error("Python: No active webview window found to open devtools.")
+            api_log.error("Python: No active webview window found to open devtools.")
 
 
 class MovieShellApp:
-    def __init__(self):
+    def __init__(self, user_content_base_dir=None):
         # Determine the base directory for bundled resources (html/, about_page.json)
         if getattr(sys, 'frozen', False):
             self.bundled_base_dir = sys._MEIPASS
@@ -453,120 +2599,290 @@ class MovieShellApp:
             script_dir = os.path.dirname(os.path.abspath(__file__))
             self.bundled_base_dir = script_dir
             self.user_content_base_dir = script_dir
+        # An explicit library directory (used by the benchmarks) overrides the default location
+        if user_content_base_dir:
+            self.user_content_base_dir = os.path.abspath(user_content_base_dir)
 
-        self.movie_data = {}
+        self.movie_data = Catalog()
         self.httpd = None
         self.server_thread = None
         self.port = HTTP_SERVER_PORT
+        self.host = ""  # "" listens on all interfaces, like the server always has
+        self.max_connections_per_client = None
+        self.max_bandwidth = None  # Total bytes per second for media, shared fairly between clients; None = unlimited
+
+        # The catalog is loaded on a background thread so that parsing movies.json overlaps with
+        # starting the HTTP server and creating the window. catalog_ready is set once it is done.
+        self.catalog_ready = threading.Event()
+        self.read_ahead = EpisodeReadAhead(self.user_content_base_dir)
+        self.subtitle_index = SubtitleIndex(self.user_content_base_dir,
+                                            os.path.join(self.user_content_base_dir, SUBTITLE_INDEX_FILENAME))
+        self.library_check = LibraryCheck(self.user_content_base_dir,
+                                          os.path.join(self.user_content_base_dir, LIBRARY_CHECK_FILENAME))
+        self.poster_placeholders = PosterPlaceholders(
+            self.user_content_base_dir, os.path.join(self.user_content_base_dir, POSTER_PLACEHOLDERS_FILENAME))
+        self.background_threads = []  # Started once the catalog is loaded
+        self._catalog_thread = threading.Thread(target=self._load_catalog, name="CatalogLoader", daemon=True)
+        self._catalog_thread.start()
+
+    def _load_catalog(self):
+        try:
+            with startup_profiler.phase("load_catalog"):
+                self._load_movie_data()
+                try:
+                    self.read_ahead.set_episode_order(self.movie_data)
+                except Exception as e:  # Read-ahead is an optimization; a malformed series must not stop the loader
+                    app_log.error("Could not determine the episode order for read-ahead: %s", e, exc_info=True)
+            with startup_profiler.phase("load_poster_placeholders"):
+                self.poster_placeholders.load_cached()
+            with startup_profiler.phase("load_library_check"):
+                self.library_check.load_cached(self.movie_data)
+        finally:
+            self.catalog_ready.set()
+        # Indexing subtitles, checking the library and generating poster placeholders read every file that
+        # changed since the last run, so they stay off the startup path
+        self.background_threads = [
+            threading.Thread(target=self._update_subtitle_index, name="SubtitleIndexer", daemon=True),
+            threading.Thread(target=self._check_library, name="LibraryCheck", daemon=True),
+            threading.Thread(target=self._update_poster_placeholders, name="PosterPlaceholders", daemon=True),
+        ]
+        for thread in self.background_threads:
+            thread.start()
+
+    def _update_subtitle_index(self):
+        try:
+            self.subtitle_index.update(self.movie_data)
+        except Exception as e:
+            app_log.error("Failed to update the subtitle index: %s", e, exc_info=True)
 
-        self._load_movie_data()
+    def _update_poster_placeholders(self):
+        try:
+            self.poster_placeholders.update(self.movie_data)
+        except Exception as e:
+            if is_shutdown_error(e):
+                app_log.debug("Poster placeholders interrupted by shutdown: %s", e)
+                return
+            app_log.error("Failed to update the poster placeholders: %s", e, exc_info=True)
+
+    def _check_library(self):
+        try:
+            self.library_check.run(self.movie_data, probe=LIBRARY_CHECK_PROBE)
+        except Exception as e:
+            if is_shutdown_error(e):
+                app_log.debug("Library check interrupted by shutdown: %s", e)
+                return
+            app_log.error("Library check failed: %s", e, exc_info=True)
+
+    def wait_for_catalog(self, timeout=None):
+        """Blocks until movies.json has been loaded. Returns False if the timeout expired first."""
+        return self.catalog_ready.wait(timeout)
+
+    def wait_for_background_tasks(self):
+        """Blocks until the catalog is loaded and the tasks started after it (see _load_catalog) are done."""
+        self._catalog_thread.join()
+        for thread in self.background_threads:
+            thread.join()
 
     def _load_movie_data(self):
+        # Loads into self.movie_data in place: the Api already holds a reference to the catalog while it loads.
         # Path for user-supplied movies.json (next to the .exe or main.py)
         user_supplied_json_path = os.path.join(self.user_content_base_dir, 'movies.json')
 
         json_path_to_load = user_supplied_json_path
 
         if not os.path.exists(user_supplied_json_path):
-            logging.info(f"movies.json not found at {user_supplied_json_path}. Creating dummy file.")
+            app_log.info("movies.json not found at %s. Creating dummy file.", user_supplied_json_path)
             try:
                 with open(user_supplied_json_path, 'w', encoding='utf-8') as f:
                     json.dump(DUMMY_MOVIES_JSON_CONTENT, f, indent=2)
-                logging.debug("Dummy movies.json created successfully.")
+                app_log.debug("Dummy movies.json created successfully.")
             except Exception as e:
-                logging.error(f"Failed to create dummy movies.json: {e}")
-                self.movie_data = {}  # Ensure data is empty if dummy creation fails
-                return
+                app_log.error("Failed to create dummy movies.json: %s", e)
+                return  # Leave the data empty if dummy creation fails
 
         try:
             with open(json_path_to_load, 'r', encoding='utf-8') as f:
                 raw_data = json.load(f)
                 if not isinstance(raw_data, dict) or 'movies' not in raw_data or 'series' not in raw_data:
-                    logging.error("Invalid movies.json structure. Expected top-level 'movies' and 'series' keys.")
-                    self.movie_data = {}
+                    app_log.error("Invalid movies.json structure. Expected top-level 'movies' and 'series' keys.")
                     return
 
-                # Flatten movies and series into a single dictionary for easier lookup
-                self.movie_data = {}  # Initialize to ensure it's empty before populating
-                for movie_title, item_details in raw_data.get('movies', {}).items():
-                    item_details['type'] = 'movie'  # Explicitly set type
-                    self.movie_data[movie_title] = item_details
+                # Flatten movies and series into a single compact catalog for easier lookup
+                self.movie_data.load(raw_data)  # Published in one step, only once fully parsed
 
-                for series_title, item_details in raw_data.get('series', {}).items():
-                    item_details['type'] = 'series'  # Explicitly set type
-                    self.movie_data[series_title] = item_details
-
-            logging.debug("Successfully loaded and processed data from %s", json_path_to_load)
+            app_log.debug("Successfully loaded and processed data from %s", json_path_to_load)
         except FileNotFoundError:
-            logging.error(
-                f"movies.json not found at {json_path_to_load} after creation attempt. This should not happen.")
-            self.movie_data = {}
+            app_log.error("movies.json not found at %s after creation attempt. This should not happen.",
+                          json_path_to_load)
         except json.JSONDecodeError as e:
-            logging.error(f"Error decoding movies.json at {json_path_to_load}: {e}")
-            self.movie_data = {}
+            app_log.error("Error decoding movies.json at %s: %s", json_path_to_load, e)
         except Exception as e:
-            logging.error(f"An unexpected error occurred loading movies.json from {json_path_to_load}: {e}")
-            self.movie_data = {}
+            app_log.error("An unexpected error occurred loading movies.json from %s: %s", json_path_to_load, e)
 
     def _start_http_server(self):
-        logging.debug("Attempting to start HTTP server.")
+        with startup_profiler.phase("start_http_server"):
+            self._start_http_server_unprofiled()
+
+    def _start_http_server_unprofiled(self):
+        app_log.debug("Attempting to start HTTP server.")
         try:
             # The HTTP server's current working directory is the user_content_base_dir.
             # This allows it to serve user-supplied media directly from subfolders like images/, movies/, etc.
             os.chdir(self.user_content_base_dir)
 
             handler = MovieShellHTTPHandler  # Use the custom handler
-            self.httpd = socketserver.TCPServer(("", self.port), handler)
+            handler.bundled_base_dir = self.bundled_base_dir
+            handler.user_content_base_dir = self.user_content_base_dir
+            with startup_profiler.phase("load_bundled_assets"):
+                asset_cache = BundledAssetCache(self.bundled_base_dir)
+                asset_cache.load()
+            handler.asset_cache = asset_cache
+            handler.read_ahead = self.read_ahead
+            handler.bandwidth = FairBandwidthScheduler(self.max_bandwidth) if self.max_bandwidth else None
+            self.httpd = create_http_server((self.host, self.port), handler,
+                                            max_connections_per_client=self.max_connections_per_client)
             self.server_thread = threading.Thread(target=self.httpd.serve_forever)
             self.server_thread.daemon = True  # Daemon threads exit when the main program exits
             self.server_thread.start()
-            logging.debug(f"Serving HTTP on http://localhost:{self.port}")
+            app_log.debug("Serving HTTP on http://localhost:%s", self.port)
         except Exception as e:
-            logging.error(f"Failed to start HTTP server: {e}")
+            app_log.error("Failed to start HTTP server: %s", e)
 
     def _stop_http_server(self):
         if self.httpd:
-            logging.debug("Shutting down HTTP server.")
+            app_log.debug("Shutting down HTTP server.")
             self.httpd.shutdown()
             self.httpd.server_close()
-            logging.debug("HTTP server stopped.")
+            MovieShellHTTPHandler.open_files.close_all()
+            app_log.debug("HTTP server stopped.")
+
+    def _on_window_loaded(self):
+        startup_profiler.mark("window_loaded")
 
     def run(self):
-        logging.debug("Starting Movie Shell application run method.")
-        self._start_http_server()
+        app_log.debug("Starting Movie Shell application run method.")
+        startup_profiler.mark("run_started")
+        # Start the HTTP server on its own thread while the (slow) webview import and window creation
+        # happen here; the catalog has been loading in the background since __init__.
+        server_start_thread = threading.Thread(target=self._start_http_server, name="HTTPServerStart", daemon=True)
+        server_start_thread.start()
+
+        with startup_profiler.phase("import_webview"):
+            import webview
 
-        self.api = Api(self.movie_data, self.port, self.user_content_base_dir)  # Pass user_content_base_dir to API
+        # The Api waits for catalog_ready itself, so it can be handed to the window before the catalog is loaded
+        self.api = Api(self.movie_data, self.port, self.user_content_base_dir, catalog_ready=self.catalog_ready,
+                       subtitle_index=self.subtitle_index, library_check=self.library_check,
+                       poster_placeholders=self.poster_placeholders)
 
         # Construct the URL for index.html, which the HTTP server will serve
         html_url = f"http://localhost:{self.port}/"  # Load the root URL, which maps to index.html
 
-        logging.debug("Creating PyWebView window.")
-        window = webview.create_window(
-            'Movie Shell',
-            url=html_url,
-            js_api=self.api,
-            width=1200,
-            height=800,
-            min_size=(800, 600),  # Minimum size for the window
-            frameless=False,  # Keep window frame (title bar, minimize/maximize/close buttons)
-            resizable=True,  # Make window not resizable by dragging
-            # fullscreen=False, # Do not start in fullscreen, allow toggle (e.g., F11)
-            # debug=False is now passed to webview.start()
-        )
+        app_log.debug("Creating PyWebView window.")
+        with startup_profiler.phase("create_window"):
+            window = webview.create_window(
+                'Movie Shell',
+                url=html_url,
+                js_api=self.api,
+                width=1200,
+                height=800,
+                min_size=(800, 600),  # Minimum size for the window
+                frameless=False,  # Keep window frame (title bar, minimize/maximize/close buttons)
+                resizable=True,  # Make window not resizable by dragging
+                # fullscreen=False, # Do not start in fullscreen, allow toggle (e.g., F11)
+                # debug=False is now passed to webview.start()
+            )
 
         # Register a callback to stop the HTTP server when the webview window is closed
         window.events.closed += self._stop_http_server
+        window.events.loaded += self._on_window_loaded
 
-        logging.debug("PyWebView starting main loop.")
+        # The page must not be requested before the server is listening
+        server_start_thread.join()
+
+        app_log.debug("PyWebView starting main loop.")
         # Start the webview application.
         # Set debug=False here to prevent dev tools from popping out automatically on startup.
         # The button will now attempt to toggle them via F12 simulation.
+        startup_profiler.mark("webview_start")
         webview.start(private_mode=False, debug=True)
-        logging.debug("PyWebView main loop ended. Script exiting.")
+        app_log.debug("PyWebView main loop ended. Script exiting.")
+        # Also covers sessions where the UI never reported a first poster (e.g. an empty library)
+        startup_profiler.write_report(os.path.join(self.user_content_base_dir, STARTUP_PROFILE_FILENAME))
 
+    def run_headless(self):
+        """
+        Serves the UI and the library to browsers on the network without opening a window. The Api is
+        exposed over HTTP (/api/<method>) instead of the pywebview bridge. Runs until interrupted (Ctrl+C).
+        """
+        app_log.debug("Starting Movie Shell in headless mode.")
+        # Browsers on other devices cannot reach "localhost", so media URLs are handed out root-relative
+        MovieShellHTTPHandler.timeout = HEADLESS_CONNECTION_TIMEOUT
+        MovieShellHTTPHandler.api = Api(self.movie_data, self.port, self.user_content_base_dir,
+                                        catalog_ready=self.catalog_ready, public_base_url="",
+                                        subtitle_index=self.subtitle_index, library_check=self.library_check,
+                                        poster_placeholders=self.poster_placeholders)
+        self._start_http_server()
+        if self.httpd is None:
+            return
+        app_log.info("Serving Movie Shell on http://%s:%s/", self.host or HEADLESS_HOST, self.port)
+        try:
+            # Waiting with a timeout keeps the main thread responsive to Ctrl+C
+            while self.server_thread.is_alive():
+                self.server_thread.join(0.5)
+        except KeyboardInterrupt:
+            app_log.info("Interrupted, shutting down.")
+        finally:
+            self._stop_http_server()
+            MovieShellHTTPHandler.api = None
+            MovieShellHTTPHandler.timeout = None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Movie Shell media library.")
+    parser.add_argument('--headless', action='store_true',
+                        help="Serve the UI to browsers on the network instead of opening a window.")
+    parser.add_argument('--host', default=None,
+                        help=f"Address to listen on in headless mode (default: {HEADLESS_HOST}).")
+    parser.add_argument('--port', type=int, default=HTTP_SERVER_PORT,
+                        help=f"HTTP port (default: {HTTP_SERVER_PORT}).")
+    parser.add_argument('--max-connections-per-client', type=int, default=None,
+                        help="Concurrent connections allowed per client address "
+                             f"(default: {HEADLESS_MAX_CONNECTIONS_PER_CLIENT} in headless mode, 0 for no limit).")
+    parser.add_argument('--max-bandwidth', type=float, default=None,
+                        help="Total media bandwidth in Mbit/s, shared fairly between clients "
+                             f"(default: {HEADLESS_MAX_BANDWIDTH_MBIT} in headless mode, otherwise unlimited; "
+                             "0 for unlimited).")
+    parser.add_argument('--library', default=None,
+                        help="Directory containing movies.json and the media folders (default: next to the program).")
+    return parser.parse_args(argv)
+
+
+startup_profiler.mark("module_imported")
 
 if __name__ == "__main__":
-    logging.debug("Script started. Entering __main__ block.")
-    app = MovieShellApp()
-    app.run()
-    logging.debug("Script finished.")
+    args = parse_args()
+    configure_logging()
+    app_log.debug("Script started. Entering __main__ block.")
+    try:
+        app = MovieShellApp(user_content_base_dir=args.library)
+        app.port = args.port
+        max_bandwidth = args.max_bandwidth
+        if max_bandwidth is None and args.headless:
+            max_bandwidth = HEADLESS_MAX_BANDWIDTH_MBIT
+        if max_bandwidth is not None and max_bandwidth > 0:
+            app.max_bandwidth = max_bandwidth * 1_000_000 / 8
+        if args.headless:
+            app.host = HEADLESS_HOST if args.host is None else args.host
+            max_connections = args.max_connections_per_client
+            app.max_connections_per_client = (HEADLESS_MAX_CONNECTIONS_PER_CLIENT if max_connections is None
+                                              else max_connections or None)
+            app.run_headless()
+        else:
+            if args.host is not None:
+                app.host = args.host
+            app.max_connections_per_client = args.max_connections_per_client or None
+            app.run()
+        app_log.debug("Script finished.")
+    finally:
+        shutdown_logging()
@@ -1,9 +1,33 @@
 // Global state variables
 let currentMediaDetails = null;
 
+// --- Detail prefetching ---
+// Details of cards in or near the viewport are fetched in batches while the app is idle,
+// so opening a detail view does not wait for a round trip through the Python bridge.
+const PREFETCH_ROOT_MARGIN = '400px'; // How far outside the viewport a card counts as "near"
+const PREFETCH_BATCH_SIZE = 24;
+const PREFETCH_MAX_ENTRIES = 500;
+const prefetchedDetails = new Map(); // name_in_json -> parsed details
+const prefetchQueue = new Set();
+// Incremented by every grid load, which drops the prefetched details: the library check may have
+// marked titles since. Batches that arrive after a reload are discarded.
+let prefetchGeneration = 0;
+let prefetchObserver = null;
+let isPrefetchScheduled = false;
+
+// --- Lazy posters ---
+// Cards first show the tiny blurred placeholder from get_all_media (when there is one); the real
+// poster is only requested once its card comes near the viewport.
+const POSTER_ROOT_MARGIN = '200px';
+let posterObserver = null;
+
+// Incremented by every grid load, so dialogue search results that arrive late are dropped
+let dialogueSearchGeneration = 0;
+
 // Initialization flags
 let isDomReady = false;
 let isPywebviewReady = false;
+let isFirstPosterReported = false; // Startup trace: the first painted poster is reported to Python once
 
 // --- DOM Element References (Declared globally, will be assigned in DOMContentLoaded) ---
 let posterGridView;
@@ -113,11 +137,27 @@ function createMediaCard(media) {
     card.dataset.nameInJson = media.name_in_json; // Store item ID for fetching details
 
     const img = document.createElement('img');
-    img.src = media.poster;
     img.alt = media.title + " Poster"; // Use media.title for alt text
+    // The real poster is loaded by loadVisiblePosters; until then the placeholder (if any) is shown blurred
+    img.dataset.src = media.poster || '';
+    if (media.poster_placeholder) {
+        img.src = media.poster_placeholder;
+        img.classList.add('blurred');
+    }
+
+    // Report the first poster that actually loaded, for the optional startup trace (cold start to first poster)
+    img.onload = () => {
+        if (img.dataset.src) return; // Still the placeholder
+        img.classList.remove('blurred');
+        if (!isFirstPosterReported && window.pywebview && window.pywebview.api && window.pywebview.api.report_startup_event) {
+            isFirstPosterReported = true;
+            window.pywebview.api.report_startup_event('first_poster');
+        }
+    };
 
     // Handle image loading errors
     img.onerror = () => {
+        if (img.dataset.src) return; // The blurred placeholder failing does not mean the poster is missing
         console.warn(`WARNING: Failed to load image for ${media.title} from ${media.poster}. Using placeholder.`);
         img.classList.add('hidden'); // Hide broken image
         // Create and insert placeholder
@@ -134,12 +174,128 @@ function createMediaCard(media) {
     card.appendChild(img);
     card.appendChild(title);
 
+    // Marked by the library check: missing, empty or unreadable files are unavailable, while
+    // containers and codecs the player may not support (MKV, HEVC) only get a warning
+    if (media.problem) {
+        const isSeries = media.type === 'series';
+        const badge = document.createElement('span');
+        badge.classList.add('problem-badge');
+        if (media.problem_blocks_playback) {
+            card.classList.add('unplayable');
+            badge.textContent = isSeries ? 'Some episodes unavailable' : 'Unavailable';
+        } else {
+            badge.classList.add('warning');
+            badge.textContent = isSeries ? 'Some episodes may not play' : 'May not play';
+        }
+        card.title = media.problem;
+        card.appendChild(badge);
+    }
+
     // Attach click listener to the entire card
     card.addEventListener('click', () => showDetailView(media.name_in_json));
     return card;
 }
 
 
+/**
+ * Swaps each card's placeholder for its real poster once the card comes near the viewport.
+ * Without IntersectionObserver every poster is loaded right away.
+ * @param {HTMLElement[]} cards - The media cards currently in the grid.
+ */
+function loadVisiblePosters(cards) {
+    if (posterObserver) posterObserver.disconnect();
+    const loadPoster = img => {
+        const src = img.dataset.src;
+        delete img.dataset.src;
+        if (src) {
+            img.src = src; // The placeholder stays on screen until the poster has loaded
+        } else {
+            img.onerror(); // No poster at all: show the "No Poster" placeholder
+        }
+    };
+    const images = cards.map(card => card.querySelector('img'));
+    if (!window.IntersectionObserver) {
+        images.forEach(loadPoster);
+        return;
+    }
+    posterObserver = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (!entry.isIntersecting) return;
+            posterObserver.unobserve(entry.target);
+            loadPoster(entry.target);
+        });
+    }, { rootMargin: POSTER_ROOT_MARGIN });
+    images.forEach(img => posterObserver.observe(img));
+}
+
+
+// --- Detail Prefetch Functions ---
+
+/**
+ * Runs a callback when the browser is idle (falls back to a short timeout where requestIdleCallback is missing).
+ * @param {Function} callback - The function to run.
+ */
+function runWhenIdle(callback) {
+    if (window.requestIdleCallback) {
+        window.requestIdleCallback(callback, { timeout: 2000 });
+    } else {
+        setTimeout(callback, 200);
+    }
+}
+
+/**
+ * Starts watching the given cards and queues the details of those entering the prefetch area.
+ * @param {HTMLElement[]} cards - The media cards currently in the grid.
+ */
+function observeCardsForPrefetch(cards) {
+    if (prefetchObserver) prefetchObserver.disconnect();
+    prefetchQueue.clear();
+    if (!window.IntersectionObserver) return;
+
+    prefetchObserver = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (!entry.isIntersecting) return;
+            const nameInJson = entry.target.dataset.nameInJson;
+            prefetchObserver.unobserve(entry.target);
+            if (!prefetchedDetails.has(nameInJson)) prefetchQueue.add(nameInJson);
+        });
+        schedulePrefetch();
+    }, { rootMargin: PREFETCH_ROOT_MARGIN });
+    cards.forEach(card => prefetchObserver.observe(card));
+}
+
+function schedulePrefetch() {
+    if (isPrefetchScheduled || prefetchQueue.size === 0) return;
+    isPrefetchScheduled = true;
+    runWhenIdle(prefetchQueuedDetails);
+}
+
+/**
+ * Fetches one batch of queued details through get_media_details_many and stores them for showDetailView.
+ */
+async function prefetchQueuedDetails() {
+    isPrefetchScheduled = false;
+    if (!(window.pywebview && window.pywebview.api && window.pywebview.api.get_media_details_many)) return;
+
+    const batch = Array.from(prefetchQueue).slice(0, PREFETCH_BATCH_SIZE);
+    batch.forEach(name => prefetchQueue.delete(name));
+    const generation = prefetchGeneration;
+    try {
+        const detailsByName = JSON.parse(await window.pywebview.api.get_media_details_many(batch));
+        Object.entries(detailsByName).forEach(([name, details]) => {
+            if (!details || generation !== prefetchGeneration) return;
+            if (prefetchedDetails.size >= PREFETCH_MAX_ENTRIES) {
+                prefetchedDetails.delete(prefetchedDetails.keys().next().value); // Drop the oldest entry
+            }
+            prefetchedDetails.set(name, details);
+        });
+    } catch (error) {
+        console.warn('WARNING: Prefetching media details failed:', error);
+    }
+    schedulePrefetch(); // Continue with the rest of the queue on the next idle period
+}
+
+
 // --- Data Loading Functions ---
 
 /**
@@ -148,6 +304,9 @@ function createMediaCard(media) {
  */
 async function loadPosterGrid(query = null) {
     console.log(`DEBUG: loadPosterGrid called. Search query: ${query}`);
+    dialogueSearchGeneration++;
+    prefetchGeneration++;
+    prefetchedDetails.clear();
     // Show loading indicator before fetching data
     if (posterGridContainer) {
         posterGridContainer.innerHTML = '<div class="loading-indicator">Loading media...</div>';
@@ -197,17 +356,75 @@ async function loadPosterGrid(query = null) {
             posterGridContainer.innerHTML = '<p class="no-results">No items found.</p>';
         }
         console.log("DEBUG: No media items found or received empty list.");
+        if (query) loadDialogueMatches(query);
         return;
     }
 
     if (posterGridContainer) {
         posterGridContainer.innerHTML = ''; // Clear loading indicator/previous content
-        mediaItems.forEach(item => {
+        const cards = mediaItems.map(item => {
             const card = createMediaCard(item);
             posterGridContainer.appendChild(card);
+            return card;
         });
+        loadVisiblePosters(cards);
+        observeCardsForPrefetch(cards);
     }
     console.log('DEBUG: All posters processed and appended to grid.');
+    if (query) loadDialogueMatches(query);
+}
+
+/**
+ * Formats a position in seconds as h:mm:ss (or m:ss under an hour).
+ * @param {number} seconds
+ * @returns {string}
+ */
+function formatTimestamp(seconds) {
+    const total = Math.floor(seconds);
+    const h = Math.floor(total / 3600);
+    const m = Math.floor((total % 3600) / 60);
+    const s = String(total % 60).padStart(2, '0');
+    return h > 0 ? `${h}:${String(m).padStart(2, '0')}:${s}` : `${m}:${s}`;
+}
+
+/**
+ * Searches the subtitles for the query and lists the matching lines below the poster grid.
+ * Clicking a line starts the movie or episode at that moment.
+ * @param {string} query - The search query.
+ */
+async function loadDialogueMatches(query) {
+    if (!(window.pywebview && window.pywebview.api && window.pywebview.api.search_dialogue)) return;
+    const generation = ++dialogueSearchGeneration;
+    let hits;
+    try {
+        hits = JSON.parse(await window.pywebview.api.search_dialogue(query));
+    } catch (error) {
+        console.error("ERROR: Dialogue search failed:", error);
+        return;
+    }
+    // A newer search (or grid reload) has started meanwhile
+    if (generation !== dialogueSearchGeneration || !posterGridContainer || !hits || hits.length === 0) return;
+
+    const section = document.createElement('section');
+    section.classList.add('dialogue-results');
+    const heading = document.createElement('h2');
+    heading.textContent = 'Dialogue';
+    section.appendChild(heading);
+    hits.forEach(hit => {
+        const item = document.createElement('button');
+        item.classList.add('episode-item', 'dialogue-item');
+        const where = document.createElement('span');
+        where.classList.add('episode-title');
+        where.textContent = `${hit.player_title} (${formatTimestamp(hit.start)})`;
+        const line = document.createElement('span');
+        line.classList.add('dialogue-text');
+        line.textContent = hit.text;
+        item.appendChild(where);
+        item.appendChild(line);
+        item.addEventListener('click', () => playMedia(hit.video_path, hit.player_title, hit.subtitle_path, hit.start));
+        section.appendChild(item);
+    });
+    posterGridContainer.appendChild(section);
 }
 
 /**
@@ -217,13 +434,18 @@ async function loadPosterGrid(query = null) {
 async function showDetailView(nameInJson) {
     console.log(`DEBUG: Showing detail view for: ${nameInJson}`);
     try {
-        currentMediaDetails = await window.pywebview.api.get_media_details(nameInJson);
-        // Ensure the result is parsed if it's a JSON string
-        try {
-            currentMediaDetails = JSON.parse(currentMediaDetails);
-        } catch (e) {
-            console.error("ERROR: Failed to parse media details JSON from Python API:", e);
-            currentMediaDetails = null; // Set to null to prevent further errors
+        if (prefetchedDetails.has(nameInJson)) {
+            currentMediaDetails = prefetchedDetails.get(nameInJson);
+        } else {
+            currentMediaDetails = await window.pywebview.api.get_media_details(nameInJson);
+            // Ensure the result is parsed if it's a JSON string
+            try {
+                currentMediaDetails = JSON.parse(currentMediaDetails);
+            } catch (e) {
+                console.error("ERROR: Failed to parse media details JSON from Python API:", e);
+                currentMediaDetails = null; // Set to null to prevent further errors
+            }
+            if (currentMediaDetails) prefetchedDetails.set(nameInJson, currentMediaDetails);
         }
     } catch (error) {
         console.error(`ERROR: Failed to fetch details for ${nameInJson}:`, error);
@@ -267,6 +489,7 @@ async function showDetailView(nameInJson) {
             playMovieButton.classList.remove('hidden');
             playMovieButton.disabled = !currentMediaDetails.has_video;
             playMovieButton.textContent = '▶ Play Movie';
+            playMovieButton.title = currentMediaDetails.problem || '';
         }
         if (seriesInfo) seriesInfo.classList.add('hidden');
     } else if (currentMediaDetails.type === 'series') {
@@ -328,10 +551,33 @@ function populateSeasonsAndEpisodes(seriesDetails) {
     }
 }
 
+/**
+ * Fetches the episodes of one season from Python (series details only carry a per-season summary)
+ * and keeps them on the season object, so switching back to a season does not ask again.
+ * @param {object} seriesDetails - The series details as returned by get_media_details.
+ * @param {string} seasonKey - The key of the season in seriesDetails.seasons.
+ * @returns {Promise<object>} The episodes of the season, keyed by episode name.
+ */
+async function fetchSeasonEpisodes(seriesDetails, seasonKey) {
+    const seasonData = seriesDetails.seasons[seasonKey];
+    if (!seasonData) return {};
+    if (!seasonData.episodes) {
+        let seasonResult = await window.pywebview.api.get_season_episodes(seriesDetails.name_in_json, seasonKey);
+        try {
+            seasonResult = JSON.parse(seasonResult);
+        } catch (e) {
+            console.error("ERROR: Failed to parse season episodes JSON from Python API:", e);
+            seasonResult = null;
+        }
+        seasonData.episodes = (seasonResult && seasonResult.episodes) || {};
+    }
+    return seasonData.episodes;
+}
+
 /**
  * Loads episodes for the currently selected season in the dropdown.
  */
-function loadEpisodesForSelectedSeason() {
+async function loadEpisodesForSelectedSeason() {
     if (episodesList) episodesList.innerHTML = ''; // Clear current episodes
     const selectedSeasonKey = seasonSelector ? seasonSelector.value : null;
     const seriesDetails = currentMediaDetails; // Use the globally stored details
@@ -341,8 +587,18 @@ function loadEpisodesForSelectedSeason() {
         return;
     }
 
-    const seasonData = seriesDetails.seasons[selectedSeasonKey];
-    const episodes = seasonData ? seasonData.episodes : {};
+    let episodes;
+    try {
+        episodes = await fetchSeasonEpisodes(seriesDetails, selectedSeasonKey);
+    } catch (error) {
+        console.error(`ERROR: Failed to load episodes for season ${selectedSeasonKey}:`, error);
+        episodes = {};
+    }
+    // The user may have picked another season (or series) while this one was loading
+    if (seriesDetails !== currentMediaDetails || (seasonSelector && seasonSelector.value !== selectedSeasonKey)) {
+        return;
+    }
+    if (episodesList) episodesList.innerHTML = ''; // Clear again in case an earlier load finished meanwhile
 
     if (Object.keys(episodes).length === 0) {
         if (episodesList) episodesList.innerHTML = '<p class="placeholder">No episodes for this season.</p>';
@@ -363,6 +619,7 @@ function loadEpisodesForSelectedSeason() {
             <span class="episode-duration">${episode.duration || ''}</span>
         `;
         episodeItem.disabled = !episode.has_video;
+        if (episode.problem) episodeItem.title = episode.problem;
         episodeItem.addEventListener('click', () => {
             if (!episodeItem.disabled) {
                 // Pass subtitle_path to playMedia for episodes
@@ -424,8 +681,9 @@ function toggleSubtitles() {
  * @param {string} mediaPath - The URL or local path of the media.
  * @param {string} title - The title to display in the player bar.
  * @param {string} [subtitlePath=null] - Optional path to the subtitle file (SRT or VTT).
+ * @param {number} [startTime=0] - Where to start a local video, in seconds (e.g. a dialogue search hit).
  */
-function playMedia(mediaPath, title, subtitlePath = null) {
+function playMedia(mediaPath, title, subtitlePath = null, startTime = 0) {
     console.log(`DEBUG: Attempting to play media: ${mediaPath}`);
     stopVideoPlayback(); // Ensure any previous media is stopped
 
@@ -478,6 +736,12 @@ function playMedia(mediaPath, title, subtitlePath = null) {
         if (localVideoPlayer) {
             localVideoPlayer.src = mediaPath;
             localVideoPlayer.classList.remove('hidden');
+            if (startTime > 0) {
+                // Seeking is only possible once the duration is known
+                localVideoPlayer.addEventListener('loadedmetadata', () => {
+                    localVideoPlayer.currentTime = startTime;
+                }, { once: true });
+            }
 
             // --- Subtitle Integration ---
             // Remove any existing track elements to prevent duplicates
@@ -650,6 +914,44 @@ window.addEventListener('pywebviewready', () => {
     }
 });
 
+/**
+ * Headless mode: the page is opened in a regular browser, so there is no pywebview bridge.
+ * The server then lists the Api methods at /api; each one is wrapped in a function that POSTs its
+ * arguments as JSON and resolves to the JSON text, just like the pywebview bridge does.
+ * In the desktop window /api answers 404 and nothing is installed.
+ */
+async function installHttpApiBridge() {
+    if (window.pywebview) return;
+    try {
+        const response = await fetch('/api');
+        if (!response.ok || window.pywebview) return;
+        const methodNames = await response.json();
+        const api = {};
+        for (const methodName of methodNames) {
+            api[methodName] = async (...args) => {
+                const callResponse = await fetch(`/api/${methodName}`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(args),
+                });
+                if (!callResponse.ok) {
+                    throw new Error(`API call ${methodName} failed with HTTP ${callResponse.status}`);
+                }
+                return callResponse.text();
+            };
+        }
+        window.pywebview = { api };
+        console.log("DEBUG: Using the HTTP API bridge (headless mode).");
+        isPywebviewReady = true;
+        initializeApp();
+    } catch (e) {
+        console.error("ERROR: Could not set up the HTTP API bridge:", e);
+    }
+}
+
+// pywebview injects its bridge before the page finishes loading, so by now a missing bridge means headless mode
+window.addEventListener('load', installHttpApiBridge);
+
 // Initialize the app when the DOM is fully loaded and parsed.
 document.addEventListener('DOMContentLoaded', () => {
     console.log("DEBUG JS: DOMContentLoaded fired. Assigning DOM element references and attaching event listeners.");
@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Main import MAX_RANGES_PER_REQUEST, parse_byte_ranges
+
+
+class ParseByteRangesTest(unittest.TestCase):
+    def test_single_ranges(self):
+        self.assertEqual(parse_byte_ranges('bytes=0-99', 1000), [(0, 99)])
+        self.assertEqual(parse_byte_ranges('bytes=500-', 1000), [(500, 999)])
+        self.assertEqual(parse_byte_ranges('BYTES = 10 - 19', 1000), [(10, 19)])
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_byte_ranges('bytes=-100', 1000), [(900, 999)])
+        self.assertEqual(parse_byte_ranges('bytes=-5000', 1000), [(0, 999)])
+        self.assertEqual(parse_byte_ranges('bytes=-0', 1000), [])
+
+    def test_last_position_is_clamped(self):
+        self.assertEqual(parse_byte_ranges('bytes=900-5000', 1000), [(900, 999)])
+
+    def test_unsatisfiable(self):
+        self.assertEqual(parse_byte_ranges('bytes=1000-', 1000), [])
+        self.assertEqual(parse_byte_ranges('bytes=0-10', 0), [])
+
+    def test_overlapping_and_adjacent_ranges_are_coalesced(self):
+        self.assertEqual(parse_byte_ranges('bytes=50-99,0-49,200-299,250-260', 1000), [(0, 99), (200, 299)])
+        self.assertEqual(parse_byte_ranges('bytes=0-9,,20-29', 1000), [(0, 9), (20, 29)])
+
+    def test_malformed_headers_are_ignored(self):
+        for header in ('items=0-9', 'bytes=', 'bytes=abc', 'bytes=5', 'bytes=-', 'bytes=9-0',
+                       'bytes=0x10-20', 'bytes=²-', 'bytes=0-١', 'bytes=1-2-3'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_byte_ranges(header, 1000))
+
+    def test_too_many_ranges(self):
+        many = ','.join(f'{i * 10}-{i * 10 + 1}' for i in range(MAX_RANGES_PER_REQUEST + 1))
+        self.assertIsNone(parse_byte_ranges('bytes=' + many, 100000))
+        allowed = ','.join(f'{i * 10}-{i * 10 + 1}' for i in range(MAX_RANGES_PER_REQUEST))
+        self.assertEqual(len(parse_byte_ranges('bytes=' + allowed, 100000)), MAX_RANGES_PER_REQUEST)
+
+
+if __name__ == '__main__':
+    unittest.main()